@@ -23,192 +23,1007 @@ import re
 import os
 import shutil
 import argparse
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque, namedtuple
+import json
+import sqlite3
+import threading
+import time
+
+from obsidian_links import Link, MDEMBED, MDLINK, read_links
 
 # 在文件操作前添加编码声明
 sys.stdout.reconfigure(encoding='utf-8')  # Python 3.7+
 
 VAULT_DIR = '../my_new_vault_dir'
-notes_map = {}  # 存储文件名和路径的映射
-all_files = []  # 存储所有文件的完整路径
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # 知识库根目录（脚本所在目录）
+INDEX_FILE = '.obsidian_link_index.sqlite'  # 链接索引文件名，保存在知识库根目录
+resolver = None  # 笔记名解析器 (NoteResolver)，由 populate_notes_map() 建立
+link_index = None  # 持久化链接索引 (LinkIndex)，为 None 时每次直接解析文件
+
+# 遍历结果：nodes 按发现顺序排列，edges 为 (源笔记, 目标笔记)，depth 为每个笔记的最小链接深度
+Subgraph = namedtuple('Subgraph', ['nodes', 'edges', 'depth'])
+
+
+class LinkIndex:
+    """
+    持久化的增量链接索引，使用 SQLite 保存在知识库旁边。
+    每篇笔记记录 (mtime, 大小, 内容哈希)，缓存其出站链接（Link 列表）；
+    再次运行时只有发生变化的笔记才会被重新读取和解析，其余直接从内存返回。
+    大小不变、只有 mtime 变了的笔记（例如被同步工具 touch 过）先比较内容哈希，内容相同时不必重新解析。
+
+    缓存的是链接中的笔记名而不是解析后的路径：解析依赖整个知识库的文件集合，
+    新增或删除文件后旧的解析结果可能失效，而名字到路径的查找本身只是一次字典访问。
+    """
+    SCHEMA_VERSION = 2
+
+    def __init__(self, base_dir, db_path=None, persistent=True):
+        """
+        :param base_dir: 知识库根目录
+        :param db_path: 索引文件路径，默认保存在知识库根目录
+        :param persistent: 为 False 时只在内存中缓存本次运行的解析结果，不读写磁盘
+        """
+        self.base_dir = base_dir
+        self.db_path = db_path or os.path.join(base_dir, INDEX_FILE)
+        self.persistent = persistent
+        self.entries = {}  # 相对路径 -> (mtime_ns, size, 哈希, 链接列表)
+        self.dirty = set()  # 本次运行中新增或更新过的条目
+        self.failed = set()  # 本次运行中无法读取的笔记，不再重试（监视模式下文件再次变化时重试）
+        self.parsed = 0  # 本次运行中重新解析的笔记数
+        if persistent:
+            self._load()
+
+    def _connect(self):
+        """打开索引数据库，版本不符时重建表结构"""
+        conn = sqlite3.connect(self.db_path)
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != self.SCHEMA_VERSION:
+            conn.execute('DROP TABLE IF EXISTS notes')
+            conn.execute('CREATE TABLE notes (path TEXT PRIMARY KEY, mtime_ns INTEGER, '
+                         'size INTEGER, hash TEXT, links TEXT)')
+            conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+            conn.commit()
+        return conn
+
+    def _load(self):
+        """从磁盘载入索引，文件损坏时丢弃并重建"""
+        try:
+            conn = self._connect()
+            try:
+                for path, mtime_ns, size, digest, links in conn.execute(
+                        'SELECT path, mtime_ns, size, hash, links FROM notes'):
+                    self.entries[path] = (mtime_ns, size, digest, [Link(*link) for link in json.loads(links)])
+            finally:
+                conn.close()
+        except (sqlite3.Error, ValueError) as e:
+            print(f"⚠️ 链接索引已损坏，将重新建立: {e}")
+            self.entries = {}
+            try:
+                os.remove(self.db_path)
+            except OSError:
+                pass
+
+    def lookup(self, rel_path):
+        """
+        只查缓存：笔记未变化时返回 Link 列表，需要（重新）解析时返回 None。
+        mtime 变了但大小不变时计算内容哈希（只读取不解析），内容相同则更新缓存中的 mtime 并沿用链接
+        """
+        entry = self.entries.get(rel_path)
+        if entry is None:
+            return None
+        full_path = os.path.join(self.base_dir, rel_path)
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            return None
+        if entry[1] != st.st_size:
+            return None
+        if entry[0] == st.st_mtime_ns:
+            return entry[3]
+        try:
+            if entry[2] != _file_digest(full_path):
+                return None
+        except OSError:
+            return None
+        self.entries[rel_path] = (st.st_mtime_ns, *entry[1:])
+        self.dirty.add(rel_path)
+        return entry[3]
+
+    def store(self, rel_path, result):
+        """
+        记录 parse_note_file() 的结果
+        :return: 链接目标列表
+        """
+        mtime_ns, size, digest, links = result
+        self.parsed += 1
+        self.entries[rel_path] = (mtime_ns, size, digest, links)
+        self.dirty.add(rel_path)
+        return links
+
+    def get(self, rel_path):
+        """
+        返回笔记的出站链接（未解析的 Link）
+        :param rel_path: 相对于知识库根目录的路径
+        :return: Link 列表，文件不存在或无法读取时返回 None
+        """
+        if rel_path in self.failed:
+            return None
+        links = self.lookup(rel_path)
+        if links is not None:
+            return links
+
+        full_path = os.path.join(self.base_dir, rel_path)
+        try:
+            result = parse_note_file(full_path)
+        except OSError as e:
+            self.fail(rel_path, e)
+            return None
+        return self.store(rel_path, result)
+
+    def fail(self, rel_path, error):
+        """记录无法读取的笔记"""
+        self.failed.add(rel_path)
+        print(f"⚠️ 无法读取文件: {rel_path} ({error})")
 
-def populate_notes_map():
-    """构建完整的文件名-路径映射表"""
-    global all_files
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    def save(self, known_paths=None):
+        """
+        把变化写回磁盘
+        :param known_paths: 当前知识库中的全部相对路径，提供时会删除已不存在的笔记的条目
+        """
+        stale = []
+        if known_paths is not None:
+            stale = [path for path in self.entries if path not in known_paths]
+            for path in stale:
+                del self.entries[path]
+        if not self.persistent or (not self.dirty and not stale):
+            return
+
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany('DELETE FROM notes WHERE path = ?', [(p,) for p in stale])
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?, ?)',
+                        [(path, *self.entries[path][:3], json.dumps(self.entries[path][3], ensure_ascii=False))
+                         for path in self.dirty if path in self.entries])
+            finally:
+                conn.close()
+            self.dirty.clear()
+        except sqlite3.Error as e:
+            print(f"⚠️ 无法保存链接索引 {self.db_path}: {e}")
+
+
+class NoteResolver:
+    """
+    紧凑的笔记名解析器。
+    每个文件的相对路径只保存一次（用整数 id 引用），另外只维护两个索引：
+    文件名 -> 候选 id，以及规范化路径 -> id。
+    同名文件出现在多个文件夹时不会互相覆盖，而是按 Obsidian 的规则挑选：
+    链接带路径时按路径后缀匹配；仍有多个候选时优先与引用笔记同一文件夹的，
+    其次取路径最短的，并把这种有歧义的链接记录下来。
+    """
+
+    def __init__(self, base_dir, case_insensitive=False):
+        self.base_dir = base_dir
+        self.case_insensitive = case_insensitive
+        self.paths = []  # id -> 相对路径（系统分隔符），已删除的文件为 None
+        self.by_path = {}  # 规范化相对路径 -> id
+        self.by_name = {}  # 文件名 -> id，重名时为 id 列表
+        self.ambiguous = {}  # 有歧义的链接 -> 全部候选路径
+        self._cache = {}  # 链接文本 -> 候选 id，文件集合变化时清空
+
+    def _key(self, path):
+        """生成索引键：统一使用 '/' 分隔，忽略大小写模式下转为小写"""
+        key = path.replace('\\', '/')
+        return key.casefold() if self.case_insensitive else key
+
+    def __len__(self):
+        return len(self.by_path)
+
+    def __contains__(self, rel_path):
+        return self._key(rel_path) in self.by_path
+
+    def files(self):
+        """返回当前登记的全部相对路径"""
+        return [path for path in self.paths if path is not None]
+
+    def add(self, rel_path):
+        """登记一个文件"""
+        key = self._key(rel_path)
+        if key in self.by_path:
+            return
+        self._cache.clear()
+        file_id = len(self.paths)
+        self.paths.append(rel_path)
+        self.by_path[key] = file_id
+
+        name = key.rsplit('/', 1)[-1]
+        ids = self.by_name.get(name)
+        if ids is None:
+            self.by_name[name] = file_id
+        elif isinstance(ids, int):
+            self.by_name[name] = [ids, file_id]
+        else:
+            ids.append(file_id)
+
+    def remove(self, rel_path):
+        """注销一个已删除的文件"""
+        key = self._key(rel_path)
+        file_id = self.by_path.pop(key, None)
+        if file_id is None:
+            return
+        self._cache.clear()
+        self.paths[file_id] = None
+
+        name = key.rsplit('/', 1)[-1]
+        ids = self.by_name[name]
+        if isinstance(ids, int):
+            del self.by_name[name]
+        else:
+            ids.remove(file_id)
+            if len(ids) == 1:
+                self.by_name[name] = ids[0]
+
+    def name_key(self, name):
+        """
+        文件名或链接目标的最后一段（不含 .md 扩展名），按解析时的大小写规则比较。
+        只有这一段相同的文件才可能成为某个链接的候选，监视模式据此判断文件增删是否影响链接
+        """
+        key = self._key(name.strip()).rsplit('/', 1)[-1]
+        return key[:-3] if key.endswith('.md') else key
+
+    def _normalize(self, name):
+        """把链接文本、相对路径或绝对路径转换为相对于知识库根目录的索引键"""
+        name = name.strip()
+        if os.path.isabs(name):
+            name = os.path.relpath(name, self.base_dir)
+        key = self._key(os.path.normpath(name))
+        while key.startswith('./'):
+            key = key[2:]
+        return key.lstrip('/')
+
+    def resolve(self, name, source=None):
+        """
+        解析链接
+        :param name: 链接中的笔记名或路径，可带或不带 .md 扩展名
+        :param source: 引用该链接的笔记的相对路径，用于在重名文件中挑选
+        :return: 相对路径，找不到时返回 None
+        """
+        # 同一个链接文本在知识库中会反复出现，候选列表只计算一次
+        ids = self._cache.get(name)
+        if ids is None:
+            ids = self._cache[name] = self._candidates(name)
+        if not ids:
+            return None
+        return self._pick(name, ids, source)
+
+    def _candidates(self, name):
+        """查找链接可能指向的全部文件 id"""
+        key = self._normalize(name)
+        if not key or key == '.':
+            return ()
+
+        # 完整路径（不带扩展名时优先匹配 .md 笔记）
+        for candidate in (key + '.md', key):
+            if candidate in self.by_path:
+                return (self.by_path[candidate],)
+
+        # 按文件名查找，链接带路径时再按路径后缀筛选
+        for candidate in (key + '.md', key):
+            name_part = candidate.rsplit('/', 1)[-1]
+            ids = self.by_name.get(name_part)
+            if ids is None:
+                continue
+            if isinstance(ids, int):
+                ids = [ids]
+            if '/' in candidate:
+                suffix = '/' + candidate
+                ids = [i for i in ids if self._key(self.paths[i]).endswith(suffix)]
+            if ids:
+                return tuple(ids)
+        return ()
+
+    def _pick(self, name, ids, source):
+        """在多个候选文件中按 Obsidian 的规则挑选一个"""
+        if len(ids) == 1:
+            return self.paths[ids[0]]
+
+        if source is not None:
+            source_dir = os.path.dirname(source)
+            same_dir = [i for i in ids if os.path.dirname(self.paths[i]) == source_dir]
+            if len(same_dir) == 1:
+                return self.paths[same_dir[0]]
+
+        ranked = sorted(ids, key=lambda i: (self.paths[i].count(os.sep), len(self.paths[i]), self.paths[i]))
+        if name not in self.ambiguous:
+            self.ambiguous[name] = [self.paths[i] for i in ranked]
+            print(f"⚠️ 链接有歧义: {name} -> 使用 {self.paths[ranked[0]]} "
+                  f"(候选: {', '.join(self.paths[i] for i in ranked)})")
+        return self.paths[ranked[0]]
+
+
+def populate_notes_map(case_insensitive=False):
+    """
+    遍历知识库，建立笔记名解析器
+    :param case_insensitive: 是否忽略大小写解析链接
+    """
+    global resolver
+    base_dir = BASE_DIR
+    resolver = NoteResolver(base_dir, case_insensitive=case_insensitive)
     
     # 遍历所有文件和子目录
     for root, dirs, files in os.walk(base_dir):
         for name in files:
-            # 获取文件完整路径
-            full_path = os.path.join(root, name)
-            # 获取文件相对路径
-            rel_path = os.path.relpath(full_path, base_dir)
-            
-            # 存储文件路径
-            all_files.append(full_path)
-            
-            # 存储多种映射方式
-            notes_map[name] = rel_path  # 完整文件名映射
-            notes_map[os.path.splitext(name)[0]] = rel_path  # 不带扩展名的映射
-            notes_map[rel_path] = rel_path  # 相对路径映射
-            notes_map[full_path] = rel_path  # 完整路径映射
-            notes_map[os.path.normpath(full_path)] = rel_path  # 规范化路径映射
+            # 跳过链接索引自身（包括 SQLite 的临时日志文件）
+            if root == base_dir and name.startswith(INDEX_FILE):
+                continue
+            resolver.add(os.path.relpath(os.path.join(root, name), base_dir))
+
+def resolve_note(name, source=None):
+    """
+    把链接名、文件名或路径解析为唯一的规范路径（相对于知识库根目录）
+    :param name: 笔记名，可带或不带 .md 扩展名
+    :param source: 引用该链接的笔记，用于在重名文件中挑选
+    :return: 规范路径，找不到时返回 None
+    """
+    return resolver.resolve(name, source)
+
+def prefetch_links(nodes, executor, jobs):
+    """
+    并发解析一层中需要更新的笔记，结果按 nodes 的顺序写入链接索引，
+    因此警告信息和遍历结果与串行执行完全一致
+    :param nodes: 本层待展开的笔记
+    :param executor: 线程池或进程池
+    :param jobs: executor 的工作者数量，用于计算分块大小
+    """
+    stale = [node for node in nodes
+             if node.endswith('.md') and node not in link_index.failed and link_index.lookup(node) is None]
+    if not stale:
+        return
+    # 分块提交，减少进程间通信的次数
+    chunksize = max(1, len(stale) // (jobs * 4))
+    results = executor.map(_parse_note_file_safe,
+                           [os.path.join(BASE_DIR, node) for node in stale],
+                           chunksize=chunksize)
+    for node, (result, error) in zip(stale, results):
+        if error is None:
+            link_index.store(node, result)
+        else:
+            link_index.fail(node, error)
+
+def walk_links(seeds, max_depth=None, jobs=1, pool='process', edges=None, cached=None):
+    """
+    从种子笔记出发逐层做广度优先遍历，每发现一个笔记就立即产出，
+    调用方可以一边遍历一边处理（例如写入压缩包）
+    :param seeds: 种子文件列表（文件名或路径均可）
+    :param max_depth: 最大链接深度 (None 表示无限深度)
+    :param jobs: 并发解析的工作者数量，大于 1 时每一层的笔记会被并发读取和解析
+    :param pool: 'process' 使用进程池（正则解析可利用多核），'thread' 使用线程池（适合 I/O 受限的情况）
+    :param edges: 可选的列表，被展开笔记（深度未达上限）的出站链接 (源, 目标) 会追加到其中
+    :param cached: 可选的 {笔记: 解析后的链接目标列表}，其中的笔记直接使用这些链接，不再读取和解析
+    :return: (规范路径, 最小深度) 生成器
+    """
+    depth = {}  # 规范路径 -> 最小深度，同时充当已访问集合
+    level = []
+
+    for seed in seeds:
+        node = resolve_note(seed)
+        if node is None:
+            print(f"⚠️ 警告: 无法找到文件 {seed} 的映射")
+            continue
+        if node not in depth:
+            depth[node] = 0
+            level.append(node)
+            yield node, 0
+
+    executor = None
+    if jobs > 1 and link_index is not None:
+        if pool == 'process':
+            from concurrent.futures import ProcessPoolExecutor as executor_class  # 载入 multiprocessing 较慢，用到时才导入
+        else:
+            executor_class = ThreadPoolExecutor
+        executor = executor_class(max_workers=jobs)
+
+    try:
+        # 逐层遍历：第一次发现某个笔记时的深度就是它的最小深度
+        node_depth = 0
+        while level:
+            if max_depth is not None and node_depth >= max_depth:
+                break
+            if executor is not None:
+                prefetch_links(level if cached is None else [node for node in level if node not in cached],
+                               executor, jobs)
 
-def get_connected_components(seeds, max_depth=None):
+            next_level = deque()
+            for node in level:
+                links = cached.get(node) if cached is not None else None
+                linked = set()
+                for target in get_links(node) if links is None else links:
+                    if target in linked:
+                        continue
+                    linked.add(target)
+                    if edges is not None:
+                        edges.append((node, target))
+                    if target not in depth:
+                        depth[target] = node_depth + 1
+                        next_level.append(target)
+                        yield target, node_depth + 1
+            level = next_level
+            node_depth += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+def traverse_links(seeds, max_depth=None, jobs=1, pool='process', cached=None):
+    """
+    从种子笔记出发做广度优先遍历，返回关联子图
+    :param seeds: 种子文件列表（文件名或路径均可）
+    :param max_depth: 最大链接深度 (None 表示无限深度)
+    :param jobs: 并发解析的工作者数量
+    :param pool: 并发方式，'process' 或 'thread'
+    :param cached: 可选的 {笔记: 解析后的链接目标列表}，见 walk_links()
+    :return: Subgraph，edges 只包含被展开的笔记（深度未达上限）的出站链接
+    """
+    edges = []
+    depth = dict(walk_links(seeds, max_depth, jobs, pool, edges, cached))
+    return Subgraph(list(depth), edges, depth)
+
+def get_connected_components(seeds, max_depth=None, jobs=1, pool='process'):
     """
     获取所有关联笔记
     :param seeds: 种子文件列表
     :param max_depth: 最大链接深度 (None 表示无限深度)
+    :param jobs: 并发解析的工作者数量
+    :param pool: 并发方式，'process' 或 'thread'
     :return: 所有关联笔记的列表
     """
-    seen = set()
-    # 使用元组 (文件路径, 当前深度)
-    queue = [(seed, 0) for seed in seeds]
-    
-    while queue:
-        fn, depth = queue.pop(0)
-        
-        # 检查是否达到深度限制
-        if max_depth is not None and depth > max_depth:
-            continue
-            
-        if fn in seen:
-            continue
-        
-        # 尝试找到文件的真实路径
-        real_path = None
-        for possible_key in [fn, os.path.normpath(fn)]:
-            if possible_key in notes_map:
-                real_path = notes_map[possible_key]
-                break
-        
-        if not real_path:
-            print(f"⚠️ 警告: 无法找到文件 {fn} 的映射")
-            continue
-        
-        # 添加到已访问集合
-        seen.add(real_path)
-        
-        # 获取出站链接
-        outgoing_links = get_links(real_path)
-        
-        # 将新链接加入队列
-        for link in outgoing_links:
-            if link not in seen:
-                queue.append((link, depth + 1))
-    
-    return list(seen)
+    return traverse_links(seeds, max_depth, jobs, pool).nodes
+
+def parse_note_file(full_path):
+    """
+    读取并解析一篇笔记。只依赖参数，可以放到线程池或进程池中执行
+    :param full_path: 笔记的完整路径
+    :return: (mtime_ns, size, 内容哈希, Link 列表)
+    """
+    st = os.stat(full_path)
+    digest, links = read_links(full_path)
+    return st.st_mtime_ns, st.st_size, digest, links
+
+def _parse_note_file_safe(full_path):
+    """parse_note_file() 的包装，把异常作为返回值，避免一篇笔记出错中断整批结果"""
+    try:
+        return parse_note_file(full_path), None
+    except OSError as e:
+        return None, str(e)
 
 def get_links(filename: str):
     """获取文件中的所有链接，支持各种格式"""
-    if not os.path.isfile(filename):
+    # 只有 Markdown 笔记包含链接，附件（图片、PDF 等）是链接图的叶子节点
+    if not filename.endswith('.md'):
         return []
-    
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            note = f.read()
-    except UnicodeDecodeError:
+
+    if link_index is not None:
+        links = link_index.get(filename)
+        if links is None:
+            return []
+    else:
         try:
-            with open(filename, 'r', encoding='gbk') as f:
-                note = f.read()
-        except:
-            print(f"⚠️ 无法读取文件: {filename}")
+            links = parse_note_file(os.path.join(BASE_DIR, filename))[3]
+        except OSError as e:
+            print(f"⚠️ 无法读取文件: {filename} ({e})")
             return []
     
-    # 匹配所有 [[...]] 格式的链接
-    pattern = r'\[\[(.*?)\]\]'
-    raw_matches = re.findall(pattern, note)
-    
     found_links = []
-    for raw_link in raw_matches:
-        # 提取基础文件名（去除锚点和块引用）
-        base_name = re.sub(r'[\#\^].*$', '', raw_link).strip()
-        
-        # 处理带别名的链接 [[文件名|别名]]
-        if '|' in base_name:
-            base_name = base_name.split('|')[0].strip()
-        
-        # 跳过空文件名
-        if not base_name:
+    for link in links:
+        # 只指向本笔记内标题或块的链接
+        if not link.target:
             continue
-            
-        # 尝试多种可能的键值
-        possible_keys = [
-            base_name + '.md',          # 带扩展名
-            base_name,                   # 不带扩展名
-            os.path.normpath(base_name)  # 规范化路径
-        ]
-        
-        matched = False
-        for key in possible_keys:
-            if key in notes_map:
-                found_links.append(notes_map[key])
-                matched = True
-                break
-        
-        if not matched:
-            print(f"⚠️ 未找到链接映射: {base_name} (来自链接: [[{raw_link}]])")
+
+        real_path = None
+        if link.kind in (MDLINK, MDEMBED):
+            # Markdown 链接通常是相对于当前笔记所在文件夹的路径
+            real_path = resolve_note(os.path.join(os.path.dirname(filename), link.target), source=filename)
+        if real_path is None:
+            real_path = resolve_note(link.target, source=filename)
+        if real_path is None:
+            print(f"⚠️ 未找到链接映射: {link.target} (来自{link.kind}链接)")
+            continue
+        found_links.append(real_path)
     
     return found_links
 
-def make_new_vault(target_notes):
-    """创建新的知识库，复制所有目标笔记"""
-    if not os.path.exists(VAULT_DIR):
-        os.makedirs(VAULT_DIR, exist_ok=True)  # 使用exist_ok更安全
-    
+def _file_digest(path):
+    """计算文件内容哈希"""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _is_up_to_date(src_path, dest_path, link_mode, checksum=False):
+    """判断目标文件是否已经是源文件的最新副本（或指向源文件的链接）"""
+    try:
+        dest_stat = os.lstat(dest_path)
+        src_stat = os.stat(src_path)
+    except OSError:
+        return False
+
+    if link_mode == 'symlink':
+        return os.path.islink(dest_path) and os.readlink(dest_path) == os.path.abspath(src_path)
+    if os.path.islink(dest_path):
+        return False
+    if link_mode == 'hardlink' and (dest_stat.st_dev, dest_stat.st_ino) == (src_stat.st_dev, src_stat.st_ino):
+        return True
+    if link_mode == 'hardlink' and dest_stat.st_dev == src_stat.st_dev:
+        # 同一文件系统上应当是硬链接，已有的普通副本也要替换掉以节省空间
+        return False
+    if dest_stat.st_size != src_stat.st_size:
+        return False
+    if checksum:
+        return _file_digest(src_path) == _file_digest(dest_path)
+    # 复制时会保留修改时间，所以未修改的文件两边的 mtime 相同
+    return dest_stat.st_mtime_ns == src_stat.st_mtime_ns
+
+def _reflink(src_path, dest_path):
+    """写时复制克隆（Btrfs、XFS 等），不支持时抛出 OSError"""
+    import fcntl
+    FICLONE = 0x40049409
+    with open(src_path, 'rb') as src, open(dest_path, 'wb') as dest:
+        fcntl.ioctl(dest.fileno(), FICLONE, src.fileno())
+    shutil.copystat(src_path, dest_path)
+
+def _place_file(src_path, dest_path, link_mode):
+    """
+    按指定方式把源文件放到目标位置。先写临时文件再原子替换，中断时不会留下半个文件
+    :return: 实际使用的方式（硬链接/克隆不可用时会退回普通复制）
+    """
+    tmp_path = os.path.join(os.path.dirname(dest_path), f".{os.path.basename(dest_path)}.tmp{os.getpid()}")
+    used = link_mode
+    try:
+        if link_mode == 'symlink':
+            os.symlink(os.path.abspath(src_path), tmp_path)
+        elif link_mode == 'hardlink':
+            try:
+                os.link(src_path, tmp_path)
+            except OSError:  # 跨文件系统等情况
+                shutil.copy2(src_path, tmp_path)
+                used = 'copy'
+        elif link_mode == 'reflink':
+            try:
+                _reflink(src_path, tmp_path)
+            except (OSError, ImportError):  # 文件系统不支持或非 Linux 系统
+                shutil.copy2(src_path, tmp_path)
+                used = 'copy'
+        else:
+            shutil.copy2(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return used
+
+def _export_one(src_path, dest_path, link_mode, checksum):
+    """导出单个文件，返回 'skipped' 或实际使用的放置方式"""
+    if _is_up_to_date(src_path, dest_path, link_mode, checksum):
+        return 'skipped'
+    return _place_file(src_path, dest_path, link_mode)
+
+def prune_vault(keep_paths, vault_dir=None):
+    """
+    删除上一次导出遗留、本次不再需要的文件和空文件夹（导出库自己的 .obsidian 配置除外）
+    :param keep_paths: 本次导出的全部目标路径
+    :return: 删除的文件数
+    """
+    vault_dir = vault_dir or VAULT_DIR
+    keep = {os.path.normpath(path) for path in keep_paths}
+    removed = 0
+    for root, dirs, files in os.walk(vault_dir, topdown=False):
+        rel_root = os.path.relpath(root, vault_dir)
+        if rel_root.split(os.sep)[0] == '.obsidian':
+            continue
+        for name in files:
+            path = os.path.normpath(os.path.join(root, name))
+            if path not in keep:
+                os.remove(path)
+                removed += 1
+                print(f"🗑️ 已删除: {os.path.relpath(path, vault_dir)}")
+        if root != vault_dir and not os.listdir(root):
+            os.rmdir(root)
+    return removed
+
+def plan_export(target_notes):
+    """
+    算出所有目标笔记的 (源路径, 目标路径)，并创建目标文件夹（每个只创建一次）
+    :param target_notes: 要导出的笔记（相对于知识库根目录的路径）
+    :return: (源路径, 目标路径) 列表
+    """
+    plan = []
     for note in target_notes:
-        try:
-            # 查找文件的真实路径
-            real_path = None
-            for possible_key in [note, os.path.normpath(note)]:
-                if possible_key in notes_map:
-                    real_path = notes_map[possible_key]
-                    break
-            
+        # 查找文件的真实路径
+        real_path = resolve_note(note)
+        if not real_path:
+            print(f"⚠️ 警告: 无法找到文件 {note} 的映射")
+            continue
+        plan.append((os.path.join(BASE_DIR, real_path), os.path.join(VAULT_DIR, real_path)))
+
+    for dest_dir in sorted({os.path.dirname(dest_path) for _, dest_path in plan}):
+        os.makedirs(dest_dir, exist_ok=True)
+    return plan
+
+def make_new_vault(target_notes, jobs=1, link_mode='copy', prune=False, checksum=False):
+    """
+    创建新的知识库，复制所有目标笔记
+    :param target_notes: 要导出的笔记（相对于知识库根目录的路径）
+    :param jobs: 并发复制的线程数
+    :param link_mode: 'copy' 复制，'hardlink' 硬链接，'reflink' 写时复制克隆，'symlink' 符号链接
+    :param prune: 是否删除目标文件夹中上一次导出遗留的文件
+    :param checksum: 是否用内容哈希（而不是大小和修改时间）判断目标文件是否需要更新
+    """
+    plan = plan_export(target_notes)
+    counts = {'skipped': 0, 'failed': 0}
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        futures = [executor.submit(_export_one, src_path, dest_path, link_mode, checksum)
+                   for src_path, dest_path in plan]
+        # 按提交顺序汇报结果，输出与串行执行一致
+        for (src_path, dest_path), future in zip(plan, futures):
+            try:
+                result = future.result()
+            except OSError as e:
+                counts['failed'] += 1
+                # 增强的错误日志
+                print(f"\n❌ 严重错误: 复制 {os.path.basename(src_path)} 失败")
+                print(f"   源文件: {src_path}")
+                print(f"   目标位置: {dest_path}")
+                print(f"   错误类型: {type(e).__name__}")
+                print(f"   错误详情: {str(e)}")
+                print("   建议操作: 检查文件名特殊字符或路径权限")
+                continue
+            counts[result] = counts.get(result, 0) + 1
+            if result != 'skipped':
+                print(f"✅ 已复制: {os.path.basename(src_path)}")
+
+    removed = prune_vault([dest_path for _, dest_path in plan]) if prune else 0
+    placed = len(plan) - counts['skipped'] - counts['failed']
+    print(f"📦 导出完成: 更新 {placed} 个, 未变化跳过 {counts['skipped']} 个, "
+          f"失败 {counts['failed']} 个, 删除旧文件 {removed} 个")
+    if link_mode in ('hardlink', 'reflink') and counts.get('copy'):
+        print(f"⚠️ {counts['copy']} 个文件无法使用 {link_mode}，已改为普通复制")
+
+# 已经压缩过的格式，写入 zip 时直接存储，不再重复压缩
+MEDIA_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.heic', '.pdf', '.mp3', '.m4a',
+                    '.ogg', '.opus', '.flac', '.mp4', '.mkv', '.webm', '.mov', '.zip', '.7z', '.gz', '.rar'}
+
+def _open_tar_zst(archive_path):
+    """打开 .tar.zst 流式写入，返回 (TarFile, 需要在之后关闭的底层对象列表)"""
+    import tarfile
+
+    if sys.version_info >= (3, 14):
+        # Python 3.14+ 标准库自带 zstd
+        return tarfile.open(archive_path, 'w|zst'), []
+    try:
+        import zstandard
+    except ImportError:
+        raise SystemExit("❌ 错误: 写入 .tar.zst 需要 Python 3.14+ 或安装 zstandard (pip install zstandard)")
+    raw = open(archive_path, 'wb')
+    writer = zstandard.ZstdCompressor().stream_writer(raw)
+    return tarfile.open(fileobj=writer, mode='w|'), [writer, raw]
+
+def write_archive(target_notes, archive_path, store_media=False):
+    """
+    把目标笔记直接流式写入压缩包，不经过中间文件夹。
+    target_notes 可以是 walk_links() 这样的生成器，遍历过程中就开始写入；
+    每个文件按块复制，内存占用与知识库大小无关
+    :param target_notes: 要导出的笔记（相对于知识库根目录的路径）
+    :param archive_path: 输出文件，支持 .zip、.tar、.tar.gz、.tar.xz、.tar.bz2、.tar.zst
+    :param store_media: 写入 zip 时图片、PDF、音视频等已压缩的文件直接存储，不再重复压缩
+    :return: 写入的文件数
+    """
+    import tarfile
+    import zipfile
+
+    lower = archive_path.lower()
+    if lower.endswith('.zip'):
+        kind = 'zip'
+    elif lower.endswith(('.tar', '.tar.gz', '.tgz', '.tar.xz', '.tar.bz2', '.tar.zst')):
+        kind = 'tar'
+    else:
+        raise SystemExit(f"❌ 错误: 不支持的压缩包格式 - {archive_path}")
+
+    # 先写入临时文件，全部完成后再改名，中断时不会留下不完整的压缩包
+    tmp_path = archive_path + '.part'
+    closers = []
+    if kind == 'zip':
+        archive = zipfile.ZipFile(tmp_path, 'w', compression=zipfile.ZIP_DEFLATED)
+    elif lower.endswith('.tar.zst'):
+        archive, closers = _open_tar_zst(tmp_path)
+    else:
+        suffix = {'.gz': 'gz', '.tgz': 'gz', '.xz': 'xz', '.bz2': 'bz2'}.get(os.path.splitext(lower)[1], '')
+        archive = tarfile.open(tmp_path, f'w|{suffix}')
+
+    written = 0
+    try:
+        for note in target_notes:
+            real_path = resolve_note(note)
             if not real_path:
                 print(f"⚠️ 警告: 无法找到文件 {note} 的映射")
                 continue
-                
-            # 构建源路径
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            src_path = os.path.join(script_dir, real_path)
-            
-            if not os.path.exists(src_path):
-                print(f"⚠️ 警告: 源文件不存在 - {src_path}")
+            src_path = os.path.join(BASE_DIR, real_path)
+            arcname = real_path.replace(os.sep, '/')
+            try:
+                if kind == 'zip':
+                    info = zipfile.ZipInfo.from_file(src_path, arcname)
+                    if store_media and os.path.splitext(real_path)[1].lower() in MEDIA_EXTENSIONS:
+                        info.compress_type = zipfile.ZIP_STORED
+                    else:
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                    with open(src_path, 'rb') as src, archive.open(info, 'w', force_zip64=True) as dest:
+                        shutil.copyfileobj(src, dest, 1 << 20)
+                else:
+                    with open(src_path, 'rb') as src:
+                        archive.addfile(archive.gettarinfo(src_path, arcname), src)
+            except OSError as e:
+                print(f"\n❌ 严重错误: 打包 {real_path} 失败")
+                print(f"   错误类型: {type(e).__name__}")
+                print(f"   错误详情: {str(e)}")
                 continue
-                
-            # 处理目标路径
-            note_dir = os.path.dirname(real_path) or '.'  # 使用真实路径的目录
-            rel_note_dir = os.path.relpath(note_dir, start='.')
-            dest_dir = os.path.join(VAULT_DIR, rel_note_dir)
-            
-            # 创建目录
-            os.makedirs(dest_dir, exist_ok=True)
-            
-            dest_path = os.path.join(dest_dir, os.path.basename(real_path))
-            
-            # 执行复制
-            shutil.copy(src_path, dest_path)
-            print(f"✅ 已复制: {os.path.basename(real_path)}")
-            
-        except Exception as e:
-            # 增强的错误日志
-            print(f"\n❌ 严重错误: 复制 {note} 失败")
-            print(f"   源文件: {src_path}")
-            print(f"   目标位置: {dest_path}")
-            print(f"   错误类型: {type(e).__name__}")
-            print(f"   错误详情: {str(e)}")
-            print("   建议操作: 检查文件名特殊字符或路径权限")
-
-def parse_arguments():
-    """解析命令行参数"""
+            written += 1
+            print(f"✅ 已打包: {arcname}")
+        archive.close()
+        for closer in closers:
+            closer.close()
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        archive.close()
+        for closer in closers:
+            closer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
+
+def _vault_snapshot():
+    """记录知识库中每个文件的 (mtime_ns, size)，供轮询模式比较"""
+    snapshot = {}
+    for root, dirs, files in os.walk(BASE_DIR):
+        for name in files:
+            if root == BASE_DIR and name.startswith(INDEX_FILE):
+                continue
+            full_path = os.path.join(root, name)
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                continue
+            snapshot[os.path.relpath(full_path, BASE_DIR)] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+def _poll_changes(interval):
+    """轮询模式：每隔 interval 秒比较一次快照，产出发生变化的相对路径集合"""
+    previous = _vault_snapshot()
+    while True:
+        time.sleep(interval)
+        current = _vault_snapshot()
+        changed = {path for path in previous.keys() | current.keys()
+                   if previous.get(path) != current.get(path)}
+        previous = current
+        if changed:
+            yield changed
+
+def _watchdog_changes(interval):
+    """
+    使用 watchdog（Linux 上基于 inotify）监听变化，产出发生变化的相对路径集合。
+    连续的事件会合并，直到安静 0.2 秒后才产出一批；文件夹被移动或删除时退回快照比较
+    """
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    lock = threading.Lock()
+    pending = set()
+    rescan = threading.Event()
+    last_event = [0.0]
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.event_type in ('opened', 'closed', 'closed_no_write'):
+                return
+            if event.is_directory:
+                if event.event_type in ('moved', 'deleted'):
+                    rescan.set()
+                return
+            with lock:
+                for path in (event.src_path, getattr(event, 'dest_path', '')):
+                    if path:
+                        rel_path = os.path.relpath(path, BASE_DIR)
+                        if not rel_path.startswith(INDEX_FILE):
+                            pending.add(rel_path)
+                last_event[0] = time.monotonic()
+
+    observer = Observer()
+    observer.schedule(Handler(), BASE_DIR, recursive=True)
+    observer.start()
+    snapshot = _vault_snapshot()
+    try:
+        while True:
+            time.sleep(min(interval, 0.2))
+            with lock:
+                if not pending and not rescan.is_set():
+                    continue
+                if time.monotonic() - last_event[0] < 0.2:
+                    continue
+                changed = set(pending)
+                pending.clear()
+            if rescan.is_set():
+                rescan.clear()
+                current = _vault_snapshot()
+                changed |= {path for path in snapshot.keys() | current.keys()
+                            if snapshot.get(path) != current.get(path)}
+                snapshot = current
+            yield changed
+    finally:
+        observer.stop()
+        observer.join()
+
+def _resolution_affected(paths, seeds, max_depth, graph):
+    """
+    新增或删除的文件是否可能改变子图中链接的解析结果：
+    只有文件名与某个种子、或某个被展开笔记中的链接目标相同（见 NoteResolver.name_key）时才可能
+    :param paths: 新增或删除的相对路径
+    """
+    keys = {resolver.name_key(os.path.basename(path)) for path in paths}
+    if any(resolver.name_key(seed) in keys for seed in seeds):
+        return True
+    entries = link_index.entries
+    targets = [link.target for node, node_depth in graph.depth.items()
+               if node in entries and (max_depth is None or node_depth < max_depth)
+               for link in entries[node][3]]
+    # 先在所有链接目标拼成的文本中查找子串，通常一次就能排除，不必逐个规范化
+    text = '\n'.join(targets)
+    if resolver.case_insensitive:
+        text = text.casefold()
+    if not any(key in text for key in keys):
+        return False
+    return any(resolver.name_key(target) in keys for target in targets)
+
+def sync_changes(changed, seeds, max_depth, graph, jobs=1, link_mode='copy', checksum=False):
+    """
+    把知识库中发生变化的文件同步到导出文件夹，只做必要的工作：
+    只有变化的笔记会被重新解析；新增或删除的文件名与子图中的链接目标相同时才重新遍历整个子图，
+    无关的文件（例如编辑器的临时文件）只登记到解析器中；
+    笔记的链接变化时只读取新链接到的笔记，其余笔记沿用上一次解析出的链接，从种子重新计算可达的笔记；
+    只复制新加入或内容变化的文件，只删除不再关联的文件
+    :param changed: 发生变化（新增、修改、删除）的相对路径集合
+    :param graph: 上一次的遍历结果 Subgraph
+    :return: 新的 Subgraph
+    """
+    added_or_removed = []
+    for rel_path in changed:
+        exists = os.path.isfile(os.path.join(BASE_DIR, rel_path))
+        if exists and rel_path not in resolver:
+            resolver.add(rel_path)
+            added_or_removed.append(rel_path)
+        elif not exists and rel_path in resolver:
+            resolver.remove(rel_path)
+            added_or_removed.append(rel_path)
+    if link_index is not None:
+        link_index.failed.difference_update(changed)  # 之前无法读取的笔记可能已经恢复
+
+    if added_or_removed and (link_index is None or _resolution_affected(added_or_removed, seeds, max_depth, graph)):
+        # 链接可能解析到不同的文件，上一次解析出的链接目标都可能失效
+        new_graph = traverse_links(seeds, max_depth)
+    else:
+        # 只有被展开的笔记（深度未达上限）的链接会影响子图
+        old_links = {rel_path: [] for rel_path in changed if rel_path in graph.depth
+                     and (max_depth is None or graph.depth[rel_path] < max_depth)}
+        if old_links:
+            for source, target in graph.edges:
+                if source in old_links:
+                    old_links[source].append(target)
+        new_links = {}
+        for rel_path, old in old_links.items():
+            links = list(dict.fromkeys(get_links(rel_path)))
+            if links != old:
+                new_links[rel_path] = links
+        if new_links:
+            # 其余被展开的笔记沿用上一次解析出的链接目标，只有新链接到的笔记需要读取
+            cached = {node: [] for node, node_depth in graph.depth.items()
+                      if max_depth is None or node_depth < max_depth}
+            for source, target in graph.edges:
+                cached[source].append(target)
+            cached.update(new_links)
+            new_graph = traverse_links(seeds, max_depth, cached=cached)
+        else:
+            new_graph = graph
+
+    old_nodes = set(graph.nodes)
+    to_copy = [node for node in new_graph.nodes if node not in old_nodes or node in changed]
+    to_delete = sorted(old_nodes.difference(new_graph.depth))
+    if to_copy:
+        make_new_vault(to_copy, jobs=jobs, link_mode=link_mode, checksum=checksum)
+    for node in to_delete:
+        dest_path = os.path.join(VAULT_DIR, node)
+        if os.path.lexists(dest_path):
+            os.remove(dest_path)
+            print(f"🗑️ 已删除: {node}")
+    return new_graph
+
+def watch_vault(seeds, max_depth, graph, jobs=1, link_mode='copy', checksum=False, interval=1.0):
+    """
+    监视模式：导出完成后持续监听知识库的变化，并增量同步到导出文件夹。
+    安装了 watchdog 时使用系统的文件事件通知（Linux 上为 inotify），否则每隔 interval 秒轮询一次
+    :param graph: 初次导出时的遍历结果 Subgraph
+    """
+    try:
+        import watchdog  # noqa: F401
+        changes = _watchdog_changes(interval)
+        print("👀 监视模式: 使用文件系统事件通知，按 Ctrl+C 退出")
+    except ImportError:
+        changes = _poll_changes(interval)
+        print(f"👀 监视模式: 每 {interval} 秒轮询一次 (pip install watchdog 可改用事件通知)，按 Ctrl+C 退出")
+
+    try:
+        for changed in changes:
+            start = time.perf_counter()
+            parsed_before = link_index.parsed if link_index is not None else 0
+            graph = sync_changes(changed, seeds, max_depth, graph, jobs, link_mode, checksum)
+            if link_index is not None:
+                link_index.save(known_paths=set(resolver.files()))
+            parsed = (link_index.parsed if link_index is not None else 0) - parsed_before
+            print(f"🔄 已同步 {len(changed)} 个变化 (重新解析 {parsed} 篇笔记, "
+                  f"用时 {(time.perf_counter() - start) * 1000:.0f} ms)")
+    except KeyboardInterrupt:
+        print("\n已退出监视模式")
+
+def parse_arguments(argv=None):
+    """解析命令行参数
+    :param argv: 参数列表，默认使用 sys.argv[1:]
+    """
     parser = argparse.ArgumentParser(description='复制Obsidian笔记及其链接')
     parser.add_argument('seeds', nargs='*', help='种子文件列表')
     parser.add_argument('-n', '--depth', type=int, default=None, 
-                        help='复制深度 (默认: 无限深度)')
+                        help='复制深度 (默认: 0，只复制种子文件；--all 为无限深度)')
     parser.add_argument('--all', action='store_true', 
                         help='复制所有关联文件 (无限深度)')
-    return parser.parse_args()
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='并发解析和复制笔记的工作者数量 (默认: 1，即串行)')
+    parser.add_argument('--pool', choices=['process', 'thread'], default='process',
+                        help='并发方式: process 利用多核解析, thread 适合网络盘等 I/O 受限场景 (默认: process)')
+    parser.add_argument('--link-mode', choices=['copy', 'hardlink', 'reflink', 'symlink'], default='copy',
+                        help='导出方式: copy 复制, hardlink 硬链接, reflink 写时复制克隆, symlink 符号链接 (默认: copy)')
+    parser.add_argument('--prune', action='store_true',
+                        help='删除导出文件夹中上一次导出遗留、本次不再需要的文件')
+    parser.add_argument('--checksum', action='store_true',
+                        help='用内容哈希而不是大小和修改时间判断文件是否需要重新复制')
+    parser.add_argument('--archive', metavar='OUT',
+                        help='直接流式写入压缩包而不是复制到文件夹 (.zip, .tar, .tar.gz, .tar.xz, .tar.zst)')
+    parser.add_argument('--store-media', action='store_true',
+                        help='写入 zip 时图片、PDF、音视频等已压缩的文件直接存储，不再重复压缩')
+    parser.add_argument('-w', '--watch', action='store_true',
+                        help='导出后继续监视知识库，把变化增量同步到导出文件夹')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='监视模式下的轮询间隔秒数 (默认: 1.0，安装 watchdog 后改用事件通知)')
+    parser.add_argument('-i', '--ignore-case', action='store_true',
+                        help='解析链接时忽略大小写')
+    parser.add_argument('--no-index', action='store_true',
+                        help=f'不使用链接索引 {INDEX_FILE}，每次重新解析所有笔记')
+    parser.add_argument('--rebuild-index', action='store_true',
+                        help='丢弃已有的链接索引并重新建立')
+    args = parser.parse_args(argv)
+    if args.watch and args.archive:
+        parser.error('--watch 不能与 --archive 同时使用')
+    return args
+
+def validate_seeds(seeds):
+    """把种子文件名解析为规范路径，去掉重复和找不到的"""
+    valid_seeds = []
+    for seed in seeds:
+        real_path = resolve_note(seed)
+        if real_path is None:
+            print(f"⚠️ 警告: 未找到种子文件 - {seed}")
+        elif real_path not in valid_seeds:
+            valid_seeds.append(real_path)
+    return valid_seeds
 
 def interactive_mode():
     """交互模式：提示用户输入文件名和深度"""
@@ -257,13 +1072,21 @@ def interactive_mode():
     return files, depth
 
 if __name__ == '__main__':
-    # 构建映射表
-    populate_notes_map()
-    print(f"找到 {len(all_files)} 个文件")
-    
     # 检查是否有命令行参数
-    if len(sys.argv) > 1:
-        args = parse_arguments()
+    # --help 和参数错误在这里就退出，不会遍历知识库
+    args = parse_arguments() if len(sys.argv) > 1 else None
+
+    use_index = True
+    jobs, pool = 1, 'process'
+    copy_options = {}
+    archive_path = None
+    if args:
+        archive_path = args.archive
+        use_index = not args.no_index
+        jobs, pool = args.jobs, args.pool
+        copy_options = {'link_mode': args.link_mode, 'prune': args.prune, 'checksum': args.checksum}
+        if args.rebuild_index and os.path.exists(os.path.join(BASE_DIR, INDEX_FILE)):
+            os.remove(os.path.join(BASE_DIR, INDEX_FILE))
         seeds = args.seeds
         max_depth = args.depth
         
@@ -273,37 +1096,54 @@ if __name__ == '__main__':
         elif max_depth is not None:
             print(f"🔍 模式: 复制 {max_depth} 层深度的关联文件")
         else:
+            max_depth = 0
             print("🔍 模式: 只复制种子文件 (深度0)")
     else:
         # 进入交互模式
         seeds, max_depth = interactive_mode()
         depth_display = "无限深度" if max_depth is None else f"{max_depth}层深度"
         print(f"\n🔍 模式: 复制{depth_display}的关联文件")
-    
+
+    if not seeds:
+        print("❌ 错误: 没有指定种子文件")
+        sys.exit(1)
+
+    # 构建映射表（交互模式下在用户输入之后才遍历知识库，提示立即出现）
+    populate_notes_map(case_insensitive=bool(args and args.ignore_case))
+    print(f"找到 {len(resolver)} 个文件")
+
     # 验证种子文件
-    valid_seeds = []
-    for seed in seeds:
-        # 尝试多种方式查找文件
-        found = False
-        for key in [seed, os.path.normpath(seed), seed + '.md']:
-            if key in notes_map:
-                valid_seeds.append(notes_map[key])
-                found = True
-                break
-        
-        if not found:
-            print(f"⚠️ 警告: 未找到种子文件 - {seed}")
-    
+    valid_seeds = validate_seeds(seeds)
     if not valid_seeds:
         print("❌ 错误: 没有有效的种子文件")
         sys.exit(1)
     
     print(f"使用种子文件: {valid_seeds}")
-    target_notes = get_connected_components(valid_seeds, max_depth=max_depth)
+    link_index = LinkIndex(BASE_DIR, persistent=use_index)
+    if archive_path:
+        # 一边遍历一边写入压缩包
+        print(f'创建压缩包: {archive_path}')
+        written = write_archive((node for node, _ in walk_links(valid_seeds, max_depth, jobs, pool)),
+                                archive_path, store_media=args.store_media)
+        target_notes = None
+    else:
+        graph = traverse_links(valid_seeds, max_depth=max_depth, jobs=jobs, pool=pool)
+        target_notes = graph.nodes
+    if use_index:
+        link_index.save(known_paths=set(resolver.files()))
+        print(f"🗂️ 链接索引: 重新解析 {link_index.parsed} 篇笔记，其余使用缓存")
+
+    if target_notes is None:
+        print(f"📦 已写入 {written} 个文件到 {archive_path}")
+        sys.exit(0)
     
     # 统计结果
     seed_count = len(valid_seeds)
     linked_count = len(target_notes) - seed_count
     print(f"📊 统计: {seed_count} 个种子文件 + {linked_count} 个关联文件")
     print(f'创建新知识库在: {VAULT_DIR}/')
-    make_new_vault(target_notes)
\ No newline at end of file
+    make_new_vault(target_notes, jobs=jobs, **copy_options)
+
+    if args and args.watch:
+        watch_vault(valid_seeds, max_depth, graph, jobs=jobs, link_mode=args.link_mode,
+                    checksum=args.checksum, interval=args.interval)
@@ -0,0 +1,13 @@
+"""
+基准测试的公共工具：载入仓库根目录下的脚本（文件名含中文、空格和括号，无法直接 import）。
+载入逻辑和脚本文件名与统一入口 toolbox.py 共用，见 script_loader.py。
+"""
+
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from script_loader import AUDIO_EXTRACTOR, BILIBILI_DOWNLOADER, IMAGE_RESIZER, OBSIDIAN_EXPORTER, load_script
@@ -0,0 +1,126 @@
+"""
+B站下载器吞吐量基准测试：
+在本机启动一个 HTTP 服务器，提供合成的 DASH 清单和分片（每个请求可模拟网络延迟和单连接限速），
+用不同的下载性能预设运行 batch_download()，报告下载速度。不需要联网。
+
+python benchmarks/download_bench.py
+python benchmarks/download_bench.py --fragments 200 --fragment-size 256 --latency 100 --profiles fast polite
+python benchmarks/download_bench.py --limit-rate 4M --jobs 3
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import load_script
+
+MPD_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" minBufferTime="PT2S"
+     mediaPresentationDuration="PT{duration}S" profiles="urn:mpeg:dash:profile:isoff-live:2011">
+  <Period>
+    <AdaptationSet mimeType="video/mp4" contentType="video">
+      <Representation id="v{index}" bandwidth="2000000" codecs="avc1.64001f" width="1280" height="720">
+        <SegmentTemplate timescale="1" duration="2" startNumber="1"
+                         initialization="init.mp4" media="seg-$Number$.m4s"/>
+      </Representation>
+    </AdaptationSet>
+  </Period>
+</MPD>
+'''
+
+
+def make_handler(fragment_count, fragment_size, latency, server_rate):
+    """生成请求处理类：/stream{n}.mpd 返回清单，其余路径返回随机字节的分片"""
+    payload = os.urandom(fragment_size)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            time.sleep(latency)  # 模拟往返延迟
+            name = self.path.rsplit('/', 1)[-1].split('?', 1)[0]
+            if name.endswith('.mpd'):
+                index = name[len('stream'):-len('.mpd')]
+                body = MPD_TEMPLATE.format(duration=fragment_count * 2, index=index).encode()
+                content_type = 'application/dash+xml'
+            else:
+                body = payload
+                content_type = 'video/mp4'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if not server_rate:
+                self.wfile.write(body)
+                return
+            # 模拟单连接限速：按 64 KiB 分块发送
+            for start in range(0, len(body), 64 << 10):
+                block = body[start:start + (64 << 10)]
+                self.wfile.write(block)
+                time.sleep(len(block) / server_rate)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='B站下载器吞吐量基准测试（本地合成 DASH 服务器）')
+    parser.add_argument('--fragments', type=int, default=60, help='每个视频的分片数 (默认: 60)')
+    parser.add_argument('--fragment-size', type=int, default=512, help='每个分片的大小，KiB (默认: 512)')
+    parser.add_argument('--latency', type=float, default=50, help='每个请求的模拟延迟，毫秒 (默认: 50)')
+    parser.add_argument('--server-rate', type=float, default=8,
+                        help='服务器单连接限速，MiB/s，0 表示不限 (默认: 8)')
+    parser.add_argument('--jobs', type=int, default=1, help='同时下载的视频数 (默认: 1)')
+    parser.add_argument('--profiles', nargs='+', default=['polite', 'balanced', 'fast'], help='要测试的下载预设')
+    parser.add_argument('--limit-rate', help='总带宽上限，例如 4M，用于检查限速是否生效')
+    args = parser.parse_args()
+
+    downloader = load_script('bilibili_downloader')
+    import yt_dlp
+
+    handler = make_handler(args.fragments, args.fragment_size << 10, args.latency / 1000,
+                           args.server_rate * (1 << 20))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = [f"{base_url}/stream{i}.mpd" for i in range(args.jobs)]
+    rate_limit = downloader.parse_rate(args.limit_rate) if args.limit_rate else None
+
+    def ydl_factory(opts):
+        # 合成分片不是真正的视频，跳过 ffmpeg 修复步骤
+        return yt_dlp.YoutubeDL(dict(opts, fixup='never', quiet=True, no_warnings=True))
+
+    expected = args.jobs * (args.fragments + 1) * (args.fragment_size << 10)
+    print(f"{args.jobs} 个视频 x {args.fragments} 个分片 x {args.fragment_size} KiB，"
+          f"延迟 {args.latency:.0f} ms，单连接限速 {args.server_rate or '不限'} MiB/s")
+    work_dir = tempfile.mkdtemp(prefix='download_bench_')
+    try:
+        for profile in args.profiles:
+            output_dir = os.path.join(work_dir, profile)
+            with contextlib.redirect_stdout(io.StringIO()):
+                summary = downloader.batch_download(urls, output_dir, workers=args.jobs, archive_file=None,
+                                                    summary_file=None, ydl_factory=ydl_factory,
+                                                    profile=profile, rate_limit=rate_limit)
+            failed = [item for item in summary['items'] if item['status'] == 'error']
+            size = sum(os.path.getsize(os.path.join(output_dir, f)) for f in os.listdir(output_dir))
+            rate = size / summary['elapsed'] / (1 << 20)
+            print(f"profile={profile:<9} {summary['elapsed']:7.2f}s  {rate:8.2f} MiB/s  "
+                  f"{size / (1 << 20):.1f}/{expected / (1 << 20):.1f} MiB  失败 {len(failed)}")
+            for item in failed:
+                print(f"  失败: {item['url']} - {item['error']}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+基准测试用的合成数据生成器：相机尺寸的 JPEG、带音轨的短视频、互相链接的笔记库。
+同一组参数（包括 seed）生成的数据完全相同，不同版本之间的测试结果可以直接比较。
+"""
+
+import os
+import random
+import shutil
+import subprocess
+
+
+def generate_images(folder, count, width, height, seed=0):
+    """生成带渐变和噪点的合成 JPEG（纯色图压缩后太小，无法反映真实的解码开销）"""
+    from PIL import Image
+
+    os.makedirs(folder, exist_ok=True)
+    gradient = Image.linear_gradient('L').resize((width, height))
+    for i in range(count):
+        noise = Image.effect_noise((width, height), 40 + (seed + i) % 30)
+        img = Image.merge('RGB', (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+        img.save(os.path.join(folder, f"img{i:05d}.jpg"), quality=90)
+
+
+def find_ffmpeg():
+    """PATH 中的 ffmpeg，找不到时借用 imageio_ffmpeg 自带的程序，都没有时返回 None"""
+    path = shutil.which('ffmpeg')
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+    except ImportError:
+        return None
+    return imageio_ffmpeg.get_ffmpeg_exe()
+
+
+def generate_videos(folder, count, duration=10, size='640x360', ffmpeg=None):
+    """
+    用 ffmpeg 的测试信号生成带 AAC 音轨的短视频（H.264 不可用时退回 MPEG-4）
+    :param duration: 每个视频的时长（秒）
+    """
+    ffmpeg = ffmpeg or find_ffmpeg()
+    if ffmpeg is None:
+        raise RuntimeError("生成测试视频需要 ffmpeg")
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        command = [ffmpeg, '-y', '-loglevel', 'error',
+                   '-f', 'lavfi', '-i', f'testsrc2=size={size}:rate=25:duration={duration}',
+                   '-f', 'lavfi', '-i', f'sine=frequency={220 + 20 * i}:duration={duration}',
+                   '-c:a', 'aac', '-b:a', '128k', '-shortest']
+        output = os.path.join(folder, f"video{i:03d}.mp4")
+        result = subprocess.run(command + ['-c:v', 'libx264', '-preset', 'ultrafast', output], capture_output=True)
+        if result.returncode != 0:
+            subprocess.run(command + ['-c:v', 'mpeg4', output], check=True)
+
+
+def generate_vault(vault_dir, note_count, links_per_note=8, folders=50, seed=0):
+    """生成合成知识库：每篇笔记包含若干段正文和随机的 [[链接]]，并保证整体连通"""
+    rng = random.Random(seed)
+    filler = "这是一段用于基准测试的正文内容，包含一些 `行内代码` 和普通文字。" * 6
+    for i in range(note_count):
+        folder = os.path.join(vault_dir, f"folder{i % folders}")
+        os.makedirs(folder, exist_ok=True)
+        targets = [f"note{(i + 1) % note_count}"]
+        targets += [f"note{rng.randrange(note_count)}" for _ in range(links_per_note - 1)]
+        lines = [f"# note{i}", ""]
+        for target in targets:
+            lines.append(filler)
+            lines.append(f"参见 [[{target}#小节|别名]] 以及 [[{target}]]。")
+        with open(os.path.join(folder, f"note{i}.md"), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
@@ -0,0 +1,64 @@
+"""
+Obsidian 导出器并发解析基准测试：
+生成一个合成知识库（默认 50000 篇笔记），分别以串行和不同的 --jobs/--pool 组合
+从同一个种子做无限深度遍历，比较耗时。每轮都使用空的内存索引，因此测的是完整解析的开销。
+
+python benchmarks/obsidian_parse_bench.py
+python benchmarks/obsidian_parse_bench.py --notes 10000 --jobs 1 4 8
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from common import load_script
+from generators import generate_vault
+
+
+def load_exporter():
+    """载入导出器脚本"""
+    return load_script('obsidian_exporter')
+
+
+def run_once(exporter, jobs, pool):
+    """使用空的内存索引完整遍历一次，返回 (耗时秒数, 笔记数)"""
+    exporter.link_index = exporter.LinkIndex(exporter.BASE_DIR, persistent=False)
+    start = time.perf_counter()
+    nodes = exporter.get_connected_components(['note0'], max_depth=None, jobs=jobs, pool=pool)
+    return time.perf_counter() - start, len(nodes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Obsidian 导出器串行/并发解析基准测试')
+    parser.add_argument('--notes', type=int, default=50000, help='合成笔记数量 (默认: 50000)')
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 2, 4, 8], help='要测试的工作者数量')
+    parser.add_argument('--vault', help='合成知识库目录 (默认: 临时目录，结束后删除)')
+    args = parser.parse_args()
+
+    vault_dir = args.vault or tempfile.mkdtemp(prefix='obsidian_bench_')
+    try:
+        if not os.path.isdir(os.path.join(vault_dir, 'folder0')):
+            print(f"正在生成 {args.notes} 篇合成笔记: {vault_dir}")
+            generate_vault(vault_dir, args.notes)
+
+        exporter = load_exporter()
+        exporter.BASE_DIR = vault_dir
+        exporter.populate_notes_map()
+        print(f"知识库共 {len(exporter.resolver)} 个文件\n")
+
+        baseline = None
+        for jobs in args.jobs:
+            for pool in (['process', 'thread'] if jobs > 1 else ['serial']):
+                elapsed, count = run_once(exporter, jobs, pool)
+                baseline = baseline or elapsed
+                print(f"jobs={jobs:<3} pool={pool:<8} {elapsed:8.2f}s  "
+                      f"{count / elapsed:10.0f} 篇/秒  加速比 {baseline / elapsed:.2f}x")
+    finally:
+        if not args.vault:
+            shutil.rmtree(vault_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
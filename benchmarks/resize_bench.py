@@ -0,0 +1,57 @@
+"""
+图片批量缩放吞吐量基准测试：
+生成一批合成的相机尺寸 JPEG，用不同的进程数运行 batch_resize_images()，报告每秒处理的图片数。
+
+python benchmarks/resize_bench.py
+python benchmarks/resize_bench.py --images 500 --size 6000x4000 --workers 1 4 16
+python benchmarks/resize_bench.py --workers 1 --presets fast balanced quality best
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+
+from common import load_script
+from generators import generate_images
+
+
+def main():
+    parser = argparse.ArgumentParser(description='batch_resize_images 吞吐量基准测试')
+    parser.add_argument('--images', type=int, default=200, help='合成图片数量 (默认: 200)')
+    parser.add_argument('--size', default='4000x3000', help='合成图片尺寸 (默认: 4000x3000)')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}), help='要测试的进程数')
+    parser.add_argument('--presets', nargs='+', default=['balanced'],
+                        help='要测试的速度/质量预设 (默认: balanced)')
+    parser.add_argument('--input', help='合成图片目录 (默认: 临时目录，结束后删除)')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    work_dir = tempfile.mkdtemp(prefix='resize_bench_')
+    input_dir = args.input or os.path.join(work_dir, 'input')
+    try:
+        if not os.path.isdir(input_dir) or not os.listdir(input_dir):
+            print(f"正在生成 {args.images} 张 {width}x{height} 的合成图片: {input_dir}")
+            generate_images(input_dir, args.images, width, height)
+
+        resizer = load_script('image_resizer')
+        baseline = None
+        for preset in args.presets:
+            for workers in args.workers:
+                output_dir = os.path.join(work_dir, f"out_{preset}_{workers}")
+                with contextlib.redirect_stdout(io.StringIO()):
+                    summary = resizer.batch_resize_images(input_dir, output_dir, 800, 600, 'jpg',
+                                                          workers=workers, preset=preset)
+                rate = summary['processed'] / summary['elapsed']
+                baseline = baseline or rate
+                print(f"preset={preset:<9} workers={workers:<3} {summary['elapsed']:8.2f}s  {rate:8.1f} 张/秒  "
+                      f"加速比 {rate / baseline:.2f}x  失败 {len(summary['failed'])}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
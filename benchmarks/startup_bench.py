@@ -0,0 +1,91 @@
+"""
+脚本启动耗时基准测试：
+用 python -X importtime 运行每个脚本的 --help（图片缩放和音频提取另加一次空输入文件夹的运行），
+报告多次运行中最快一次的墙钟时间，以及累计导入耗时最多的模块。
+
+python benchmarks/startup_bench.py
+python benchmarks/startup_bench.py --repeat 10 --top 5
+python benchmarks/startup_bench.py --scripts download toolbox
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import AUDIO_EXTRACTOR, BILIBILI_DOWNLOADER, IMAGE_RESIZER, OBSIDIAN_EXPORTER, REPO_DIR
+
+SCRIPTS = {
+    'resize': IMAGE_RESIZER,
+    'audio': AUDIO_EXTRACTOR,
+    'download': BILIBILI_DOWNLOADER,
+    'obsidian': OBSIDIAN_EXPORTER,
+    'toolbox': 'toolbox.py',
+}
+
+
+def build_cases(names, empty_dir):
+    """用例名 -> 命令行参数列表（不含解释器和 -X importtime）"""
+    cases = {}
+    for name in names:
+        script = os.path.join(REPO_DIR, SCRIPTS[name])
+        cases[f'{name} --help'] = [script, '--help']
+        if name in ('resize', 'audio'):
+            cases[f'{name} 空文件夹'] = [script, empty_dir, os.path.join(empty_dir, 'out')]
+    return cases
+
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 的输出
+    :return: [(累计微秒, 模块名)]，只包含顶层导入（被其他模块间接导入的不重复计算）
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|', 2)
+        if not name.startswith('  '):  # 缩进表示嵌套层级，只有一个空格的是顶层导入
+            imports.append((int(cumulative), name.strip()))
+    return imports
+
+
+def run_case(argv, repeat):
+    """运行 repeat 次，返回 (最快一次的秒数, 该次的导入列表, 退出码)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime'] + argv, cwd=REPO_DIR,
+                                stdin=subprocess.DEVNULL, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, parse_importtime(result.stderr), result.returncode)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='脚本启动耗时基准测试')
+    parser.add_argument('--scripts', nargs='+', choices=list(SCRIPTS), default=list(SCRIPTS),
+                        help='要测试的脚本 (默认: 全部)')
+    parser.add_argument('--repeat', type=int, default=5, help='每个用例运行的次数，取最快的一次 (默认: 5)')
+    parser.add_argument('--top', type=int, default=3, help='列出累计导入耗时最多的模块数量 (默认: 3)')
+    args = parser.parse_args()
+
+    empty_dir = tempfile.mkdtemp(prefix='startup_bench_')
+    try:
+        for name, argv in build_cases(args.scripts, empty_dir).items():
+            elapsed, imports, returncode = run_case(argv, args.repeat)
+            total = sum(us for us, _ in imports)
+            flag = '' if returncode == 0 else f'  ⚠️ 退出码 {returncode}'
+            print(f"{name:<18} {elapsed * 1000:7.1f} ms  导入 {total / 1000:7.1f} ms{flag}")
+            for us, module in sorted(imports, reverse=True)[:args.top]:
+                print(f"    {us / 1000:7.1f} ms  {module}")
+    finally:
+        shutil.rmtree(empty_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
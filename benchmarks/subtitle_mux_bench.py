@@ -0,0 +1,144 @@
+"""
+B站下载器字幕处理方式的磁盘写入量对比：
+用 ffmpeg 生成一段只有画面的 mp4、一段只有声音的 m4a 和一份 .srt 字幕，由本机 HTTP 服务器提供，
+分别用 embed / mux / sidecar 三种字幕处理方式运行 batch_download()，
+统计每种方式写入磁盘的字节数（下载本身 + ffmpeg 子进程）和耗时。不需要联网。
+
+python benchmarks/subtitle_mux_bench.py
+python benchmarks/subtitle_mux_bench.py --duration 120 --video-bitrate 16M --modes embed mux
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import os
+import resource
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from common import load_script
+
+SRT_LINE = '{n}\n00:{m:02d}:{s:02d},000 --> 00:{m:02d}:{s:02d},900\n第 {n} 条字幕\n\n'
+
+
+def find_ffmpeg_dir(work_dir):
+    """返回包含名为 ffmpeg 的可执行文件的目录；PATH 中没有时借用 imageio_ffmpeg 自带的程序"""
+    path = shutil.which('ffmpeg')
+    if path:
+        return os.path.dirname(path)
+    import imageio_ffmpeg
+    bin_dir = os.path.join(work_dir, 'bin')
+    os.makedirs(bin_dir, exist_ok=True)
+    # yt-dlp 按文件名识别 ffmpeg，所以用一个名为 ffmpeg 的链接指向它
+    os.symlink(imageio_ffmpeg.get_ffmpeg_exe(), os.path.join(bin_dir, 'ffmpeg'))
+    return bin_dir
+
+
+def make_fixture(ffmpeg, site_dir, duration, video_bitrate):
+    """生成只有画面的 video.mp4、只有声音的 audio.m4a 和 subs.srt"""
+    os.makedirs(site_dir, exist_ok=True)
+    common = [ffmpeg, '-y', '-loglevel', 'error']
+    subprocess.run(common + ['-f', 'lavfi', '-i', f'testsrc2=size=1280x720:rate=25:duration={duration}',
+                             '-c:v', 'mpeg4', '-b:v', video_bitrate, os.path.join(site_dir, 'video.mp4')],
+                   check=True)
+    subprocess.run(common + ['-f', 'lavfi', '-i', f'sine=frequency=440:duration={duration}',
+                             '-c:a', 'aac', '-b:a', '192k', os.path.join(site_dir, 'audio.m4a')], check=True)
+    with open(os.path.join(site_dir, 'subs.srt'), 'w', encoding='utf-8') as f:
+        for n in range(int(duration)):
+            f.write(SRT_LINE.format(n=n + 1, m=n // 60, s=n % 60))
+
+
+def make_info(base_url):
+    """手工构造的视频信息，相当于提取器对一个“音视频分离 + 中文字幕”的 B站视频的解析结果"""
+    return {
+        'id': 'fixture', 'title': 'fixture', 'uploader': 'bench',
+        'extractor': 'generic', 'extractor_key': 'Generic', 'webpage_url': f'{base_url}/',
+        'formats': [
+            {'format_id': 'video', 'url': f'{base_url}/video.mp4', 'ext': 'mp4',
+             'vcodec': 'mp4v.20.9', 'acodec': 'none', 'width': 1280, 'height': 720},
+            {'format_id': 'audio', 'url': f'{base_url}/audio.m4a', 'ext': 'm4a',
+             'vcodec': 'none', 'acodec': 'mp4a.40.2'},
+        ],
+        'subtitles': {'zh-Hans': [{'url': f'{base_url}/subs.srt', 'ext': 'srt'}]},
+    }
+
+
+def written_bytes():
+    """(本进程写入的字节数, 已结束的子进程写入磁盘的字节数)"""
+    own = 0
+    with open('/proc/self/io') as f:
+        for line in f:
+            key, value = line.split(':')
+            if key == 'write_bytes':
+                own = int(value)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_oublock * 512
+    return own, children
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比较 embed / mux / sidecar 三种字幕处理方式的磁盘写入量')
+    parser.add_argument('--duration', type=int, default=60, help='测试视频的时长，秒 (默认: 60)')
+    parser.add_argument('--video-bitrate', default='8M', help='测试视频的码率 (默认: 8M)')
+    parser.add_argument('--modes', nargs='+', default=['embed', 'mux', 'sidecar'], help='要测试的字幕处理方式')
+    args = parser.parse_args()
+
+    downloader = load_script('bilibili_downloader')
+    import yt_dlp
+
+    work_dir = tempfile.mkdtemp(prefix='subtitle_mux_bench_')
+    site_dir = os.path.join(work_dir, 'site')
+    ffmpeg_dir = find_ffmpeg_dir(work_dir)
+    make_fixture(os.path.join(ffmpeg_dir, 'ffmpeg'), site_dir, args.duration, args.video_bitrate)
+    source_size = sum(os.path.getsize(os.path.join(site_dir, f)) for f in os.listdir(site_dir))
+
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=site_dir))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    class FixtureYoutubeDL(yt_dlp.YoutubeDL):
+        # 跳过提取器，直接返回手工构造的视频信息
+        def extract_info(self, url, download=True, ie_key=None, extra_info=None, process=True,
+                         force_generic_extractor=False):
+            info = make_info(base_url)
+            return self.process_ie_result(info, download) if process else info
+
+    def ydl_factory(opts):
+        return FixtureYoutubeDL(dict(opts, ffmpeg_location=ffmpeg_dir, quiet=True, no_warnings=True))
+
+    print(f"测试素材 {source_size / (1 << 20):.1f} MiB（{args.duration} 秒，视频码率 {args.video_bitrate}）")
+    try:
+        for mode in args.modes:
+            output_dir = os.path.join(work_dir, mode)
+            own_before, children_before = written_bytes()
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                summary = downloader.batch_download([f'{base_url}/'], output_dir, download_subtitle=True,
+                                                    workers=1, archive_file=None, summary_file=None,
+                                                    ydl_factory=ydl_factory, subtitle_mode=mode)
+            elapsed = time.perf_counter() - start
+            own_after, children_after = written_bytes()
+            own, children = own_after - own_before, children_after - children_before
+            item = summary['items'][0]
+            files = ', '.join(sorted(os.listdir(output_dir)))
+            print(f"mode={mode:<8} {elapsed:6.2f}s  下载写入 {own / (1 << 20):7.1f} MiB  "
+                  f"ffmpeg 写入 {children / (1 << 20):7.1f} MiB  "
+                  f"合计 {(own + children) / source_size:4.2f} 倍素材大小  "
+                  f"{downloader.format_phases(item['phases'])}")
+            print(f"  {item['status']}: {item.get('error') or files}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
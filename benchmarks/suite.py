@@ -0,0 +1,174 @@
+"""
+工具脚本吞吐量回归测试套件：
+生成合成数据（图片、短视频、笔记库），通过 toolbox.run_tool() 用不同的执行器运行各个工具，
+把每个用例的吞吐量、CPU 时间、读写字节数和峰值内存写入 JSON；
+用 --compare 与旧版本的结果比较，吞吐量下降超过阈值时以状态码 1 退出。不需要联网。
+
+python benchmarks/suite.py --output before.json
+python benchmarks/suite.py --output after.json --compare before.json
+python benchmarks/suite.py --data /tmp/suite_data --cases resize-process obsidian-thread --repeat 3
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from common import REPO_DIR
+from generators import find_ffmpeg, generate_images, generate_vault, generate_videos
+from toolbox import load_tool, run_tool
+
+
+def build_cases(data_dir, workers):
+    """用例名 -> (工具名, 工具参数生成函数(输出目录), 执行器, 工作者数, 配置回调生成函数(输出目录))"""
+    images, videos, vault = (os.path.join(data_dir, name) for name in ('images', 'videos', 'vault'))
+
+    def vault_config(out):
+        def configure(module):
+            module.BASE_DIR, module.VAULT_DIR = vault, out
+        return configure
+
+    cases = {}
+    for executor, n in (('serial', 1), ('process', workers)):
+        cases[f'resize-{executor}'] = ('resize', lambda out: [images, out, '-f', 'jpg'], executor, n, None)
+    cases['render-process'] = ('resize', lambda out: [images, out, '-r', '1920x1080:jpg:85', '-r', '800x600:webp:80',
+                                                      '-r', '200x200:png'], 'process', workers, None)
+    for fmt, name in (('m4a', 'copy'), ('mp3', 'mp3')):
+        for executor, n in (('serial', 1), ('thread', workers)):
+            cases[f'audio-{name}-{executor}'] = ('audio', lambda out, fmt=fmt: [videos, out, '-f', fmt],
+                                                 executor, n, None)
+    for executor, n in (('serial', 1), ('thread', workers)):
+        cases[f'obsidian-{executor}'] = ('obsidian', lambda out: ['--all', '--no-index', 'note0'],
+                                         executor, n, vault_config)
+    return cases
+
+
+def generate_data(data_dir, args):
+    """生成缺少的合成数据"""
+    images, videos, vault = (os.path.join(data_dir, name) for name in ('images', 'videos', 'vault'))
+    if not os.path.isdir(images):
+        width, height = (int(v) for v in args.image_size.lower().split('x'))
+        print(f"正在生成 {args.images} 张 {width}x{height} 的合成图片...")
+        generate_images(images, args.images, width, height)
+    if not os.path.isdir(videos):
+        print(f"正在生成 {args.videos} 个 {args.video_duration} 秒的合成视频...")
+        generate_videos(videos, args.videos, args.video_duration)
+    if not os.path.isdir(vault):
+        print(f"正在生成 {args.notes} 篇合成笔记...")
+        generate_vault(vault, args.notes)
+
+
+def git_revision():
+    """当前代码版本，不是 git 仓库时返回 None"""
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_case(case, work_dir, repeat):
+    """运行一个用例 repeat 次，返回吞吐量最高的一次的汇总"""
+    tool, make_argv, executor, workers, make_config = case
+    load_tool(tool)  # 在重定向输出之前载入脚本（导出器载入时会重新配置 sys.stdout）
+    best = None
+    for _ in range(repeat):
+        out = tempfile.mkdtemp(prefix='out_', dir=work_dir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                report = run_tool(tool, make_argv(out), executor=executor, workers=workers,
+                                  configure=make_config(out) if make_config else None)
+        finally:
+            shutil.rmtree(out, ignore_errors=True)
+        summary = dict(report['summary'], prepare=report['prepare'], executor=executor, workers=workers)
+        if best is None or (summary['items_per_second'] or 0) > (best['items_per_second'] or 0):
+            best = summary
+    return best
+
+
+def compare(results, baseline, threshold):
+    """打印与基线的吞吐量对比，返回出现回退的用例名列表"""
+    print(f"\n与基线 {baseline['meta'].get('revision')} 比较 (阈值 {threshold:.0%}):")
+    regressions = []
+    for name, summary in results.items():
+        old = baseline['cases'].get(name)
+        if not old or not old.get('items_per_second') or summary['items_per_second'] is None:
+            continue
+        ratio = summary['items_per_second'] / old['items_per_second']
+        flag = ''
+        if ratio < 1 - threshold:
+            flag = '  ⚠️ 回退'
+            regressions.append(name)
+        print(f"  {name:<22} {old['items_per_second']:9.2f} -> {summary['items_per_second']:9.2f} 项/秒  "
+              f"{ratio:5.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='工具脚本吞吐量回归测试套件')
+    parser.add_argument('--data', help='合成数据目录，已存在的数据会被复用 (默认: 临时目录，结束后删除)')
+    parser.add_argument('--images', type=int, default=40, help='合成图片数量 (默认: 40)')
+    parser.add_argument('--image-size', default='3000x2000', help='合成图片尺寸 (默认: 3000x2000)')
+    parser.add_argument('--videos', type=int, default=8, help='合成视频数量 (默认: 8)')
+    parser.add_argument('--video-duration', type=int, default=10, help='每个合成视频的时长，秒 (默认: 10)')
+    parser.add_argument('--notes', type=int, default=2000, help='合成笔记数量 (默认: 2000)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='并发用例的工作者数量 (默认: CPU 核心数)')
+    parser.add_argument('--cases', nargs='+', help='只运行这些用例 (默认: 全部)')
+    parser.add_argument('--repeat', type=int, default=1, help='每个用例运行的次数，取最好的一次 (默认: 1)')
+    parser.add_argument('--output', help='把结果写入 JSON 文件')
+    parser.add_argument('--compare', metavar='BASELINE', help='与之前保存的结果比较')
+    parser.add_argument('--threshold', type=float, default=0.1, help='吞吐量下降超过该比例视为回退 (默认: 0.1)')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='suite_')
+    data_dir = args.data or os.path.join(work_dir, 'data')
+    try:
+        cases = build_cases(data_dir, args.workers)
+        unknown = set(args.cases or ()) - set(cases)
+        if unknown:
+            parser.error(f"未知的用例: {', '.join(sorted(unknown))}，可选 {', '.join(cases)}")
+        if find_ffmpeg() is None:
+            print("⚠️ 未找到 ffmpeg，跳过音频用例")
+            cases = {name: case for name, case in cases.items() if case[0] != 'audio'}
+        generate_data(data_dir, args)
+
+        results = {}
+        for name, case in cases.items():
+            if args.cases and name not in args.cases:
+                continue
+            summary = run_case(case, work_dir, args.repeat)
+            results[name] = summary
+            print(f"{name:<22} {summary['elapsed']:7.2f}s  {summary['items_per_second'] or 0:9.2f} 项/秒  "
+                  f"CPU {summary['cpu'] or 0:6.2f}s  写入 {(summary['write_bytes'] or 0) / (1 << 20):7.1f} MiB  "
+                  f"峰值内存 {(summary['peak_rss'] or 0) / (1 << 20):6.1f} MiB  失败 {summary['failed']}")
+
+        report = {'meta': {'revision': git_revision(), 'python': sys.version.split()[0],
+                           'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+                           'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                           'data': {key: getattr(args, key) for key in
+                                    ('images', 'image_size', 'videos', 'video_duration', 'notes')}},
+                  'cases': results}
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"结果已写入 {args.output}")
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                regressions = compare(results, json.load(f), args.threshold)
+            if regressions:
+                print(f"❌ {len(regressions)} 个用例吞吐量回退: {', '.join(regressions)}")
+                sys.exit(1)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
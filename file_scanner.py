@@ -0,0 +1,84 @@
+"""
+批处理脚本共用的文件查找器，供 `修改照片大小（...）.py` 和 `视频声音分离（...）.py` 使用（需放在同一目录下）。
+
+基于 os.scandir，每个目录只遍历一次：
+    - 扩展名不区分大小写（.JPG 和 .jpg 都能找到，也不会重复列出）
+    - 可选递归进入子文件夹（不跟随指向文件夹的符号链接），返回的相对路径可用于在输出文件夹中还原目录结构
+    - 支持 include / exclude 通配符，匹配相对路径（用 '/' 分隔），也匹配文件名
+    - 以生成器方式逐个产出文件，不必等整棵目录树扫描完就可以开始处理
+"""
+
+import os
+from collections import namedtuple
+from fnmatch import fnmatchcase
+
+# path: 完整路径；rel_path: 相对于输入文件夹的路径；entry: os.DirEntry，entry.stat() 结果会被缓存
+FoundFile = namedtuple('FoundFile', ['path', 'rel_path', 'entry'])
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+
+
+def _matches(rel_path, patterns):
+    """相对路径或文件名匹配任意一个通配符（不区分大小写）"""
+    rel_path = rel_path.lower()
+    name = rel_path.rsplit('/', 1)[-1]
+    return any(fnmatchcase(rel_path, p) or fnmatchcase(name, p) for p in patterns)
+
+
+def scan_files(root, extensions, recursive=False, include=None, exclude=None, skip_dirs=(), errors=None):
+    """
+    查找文件夹中指定扩展名的文件
+    :param root: 输入文件夹
+    :param extensions: 扩展名列表，例如 ('.jpg', '.png')，不区分大小写
+    :param recursive: 是否递归进入子文件夹
+    :param include: 可选的通配符列表，只保留匹配的文件，例如 ['2024/*', '*_raw.*']
+    :param exclude: 可选的通配符列表，排除匹配的文件；匹配的子文件夹整个跳过
+    :param skip_dirs: 不进入的文件夹路径，例如位于输入文件夹内部的输出文件夹
+    :param errors: 可选的列表，无法读取的文件夹（包括输入文件夹本身）或条目以 (相对路径, 异常) 追加到其中，
+                   调用方据此判断扫描结果是否完整
+    :return: FoundFile 生成器，同一文件夹内按文件名排序，先产出文件再进入子文件夹
+    """
+    extensions = tuple(ext.lower() for ext in extensions)
+    include = [p.lower().replace(os.sep, '/') for p in include or ()]
+    exclude = [p.lower().replace(os.sep, '/') for p in exclude or ()]
+    skip_dirs = {os.path.normcase(os.path.abspath(d)) for d in skip_dirs}
+
+    stack = ['']  # 待扫描的相对目录
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            with os.scandir(os.path.join(root, rel_dir) if rel_dir else root) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            if errors is not None:
+                errors.append((rel_dir, e))
+            print(f"⚠️ 无法读取文件夹 {rel_dir or root}: {e}")
+            continue
+
+        sub_dirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                # 与 os.walk 一样不进入指向文件夹的符号链接，避免链接成环时重复产出文件、无限递归
+                is_dir = entry.is_dir(follow_symlinks=False)
+                is_file = not is_dir and entry.name.lower().endswith(extensions) and entry.is_file()
+            except OSError as e:
+                if errors is not None:
+                    errors.append((rel_path, e))
+                print(f"⚠️ 无法读取 {rel_path}: {e}")
+                continue
+            if is_dir:
+                if (recursive and not entry.name.startswith('.') and not _matches(rel_path, exclude)
+                        and os.path.normcase(os.path.abspath(entry.path)) not in skip_dirs):
+                    sub_dirs.append(rel_path)
+                continue
+            if not is_file:
+                continue
+            if include and not _matches(rel_path, include):
+                continue
+            if exclude and _matches(rel_path, exclude):
+                continue
+            yield FoundFile(entry.path, rel_path.replace('/', os.sep), entry)
+        # 倒序压栈，使子文件夹按名称顺序处理
+        stack.extend(reversed(sub_dirs))
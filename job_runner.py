@@ -0,0 +1,255 @@
+"""
+工具脚本共用的任务执行层，供 toolbox.py 和 benchmarks/ 使用（需放在同一目录下）。
+
+    - 可替换的执行器：serial 串行、thread 线程池、process 进程池
+    - 每个任务记录墙钟时间、CPU 时间、读写字节数和峰值内存
+    - 单个任务出错只记为失败，不影响其他任务
+    - 可选对每个任务做 cProfile 分析，最后合并成一个 pstats 文件
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+try:
+    import resource  # Windows 上没有
+except ImportError:
+    resource = None
+
+EXECUTORS = ('serial', 'thread', 'process')
+
+# label: 显示名称；args: 传给任务函数的参数元组（使用进程池时必须可以 pickle）
+Job = namedtuple('Job', ['label', 'args'])
+
+# 单个任务的统计：时间单位为秒，字节数和内存单位为字节，无法测量的项为 None
+ItemStats = namedtuple('ItemStats', ['index', 'label', 'status', 'note', 'error', 'wall', 'cpu',
+                                     'read_bytes', 'write_bytes', 'peak_rss', 'child_peak_rss'])
+
+# ru_maxrss 在 Linux 上以 KiB 为单位，在 macOS 上以字节为单位
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+# Linux 上每个线程有自己的 I/O 计数，线程池中各任务的读写量互不干扰
+_IO_FILE = next((path for path in ('/proc/thread-self/io', '/proc/self/io') if os.path.exists(path)), None)
+
+
+class SerialExecutor(Executor):
+    """在调用线程中立即执行任务的执行器，接口与线程池/进程池相同"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def make_executor(kind, workers=1):
+    """
+    创建执行器
+    :param kind: 'serial'、'thread' 或 'process'
+    :param workers: 线程池/进程池的工作者数量
+    """
+    if kind == 'serial':
+        return SerialExecutor()
+    if kind == 'thread':
+        return ThreadPoolExecutor(max_workers=max(1, workers))
+    if kind == 'process':
+        from concurrent.futures import ProcessPoolExecutor  # 载入 multiprocessing 较慢，用到时才导入
+        return ProcessPoolExecutor(max_workers=max(1, workers))
+    raise ValueError(f"未知的执行器: {kind}，可选 {', '.join(EXECUTORS)}")
+
+
+def _io_counters():
+    """
+    (读取字节数, 写入字节数)：本线程经由 read/write 系统调用的字节数，加上已结束子进程（如 ffmpeg）的块设备读写量。
+    子进程的统计是整个进程共用的，线程池中同时结束的任务之间只能近似区分
+    """
+    read = write = None
+    if _IO_FILE:
+        with open(_IO_FILE) as f:
+            counters = dict(line.split(':', 1) for line in f if ':' in line)
+        read, write = int(counters['rchar']), int(counters['wchar'])
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        if read is None:
+            own = resource.getrusage(resource.RUSAGE_SELF)
+            read, write = own.ru_inblock * 512, own.ru_oublock * 512
+        read += children.ru_inblock * 512
+        write += children.ru_oublock * 512
+    return read, write
+
+
+def _cpu_time():
+    """本线程的 CPU 时间加上已结束子进程的 CPU 时间"""
+    cpu = time.thread_time()
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu += children.ru_utime + children.ru_stime
+    return cpu
+
+
+def _peak_rss():
+    """(本进程峰值内存, 子进程中最大的峰值内存)"""
+    if resource is None:
+        return None, None
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * _MAXRSS_UNIT)
+
+
+def _delta(before, after):
+    return None if before is None or after is None else after - before
+
+
+def _measured_call(func, args, profile_path=None):
+    """
+    在工作者中执行一个任务并测量资源消耗，异常转换为返回值
+    :return: (结果, 错误信息, 测量值字典)
+    """
+    read_before, write_before = _io_counters()
+    cpu_before = _cpu_time()
+    profiler = None
+    if profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+    start = time.perf_counter()
+    result, error = None, None
+    try:
+        if profiler:
+            result = profiler.runcall(func, *args)
+        else:
+            result = func(*args)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - start
+    cpu = _cpu_time() - cpu_before
+    read_after, write_after = _io_counters()
+    if profiler:
+        profiler.dump_stats(profile_path)
+    peak_rss, child_peak_rss = _peak_rss()
+    measurements = {'wall': wall, 'cpu': cpu, 'read_bytes': _delta(read_before, read_after),
+                    'write_bytes': _delta(write_before, write_after),
+                    'peak_rss': peak_rss, 'child_peak_rss': child_peak_rss}
+    return result, error, measurements
+
+
+def run_jobs(func, jobs, executor='serial', workers=1, profile_dir=None, on_result=None):
+    """
+    用指定的执行器运行一批任务，逐个记录资源消耗
+    :param func: 任务函数，以 func(*job.args) 调用；使用进程池时必须是模块顶层函数。
+                 返回字符串时作为该任务的说明记录下来
+    :param jobs: Job 列表
+    :param executor: 'serial'、'thread' 或 'process'
+    :param workers: 线程池/进程池的工作者数量，同时提交的任务数不超过它的两倍
+    :param profile_dir: 不为 None 时对每个任务做 cProfile 分析，结果保存为该目录下的 item-序号.prof
+    :param on_result: 每个任务完成时调用 on_result(ItemStats, 已完成数, 总数)，默认打印一行结果
+    :return: 按 jobs 顺序排列的 ItemStats 列表
+    """
+    jobs = list(jobs)
+    on_result = on_result or print_item
+    results = [None] * len(jobs)
+
+    def collect(index, future):
+        job = jobs[index]
+        try:
+            result, error, measurements = future.result()
+        except Exception as e:  # 进程池中的工作进程异常退出等
+            result, error, measurements = None, f"{type(e).__name__}: {e}", dict.fromkeys(ItemStats._fields[5:])
+        note = result if isinstance(result, str) else None
+        results[index] = ItemStats(index, job.label, 'failed' if error else 'ok', note, error, **measurements)
+        on_result(results[index], sum(r is not None for r in results), len(jobs))
+
+    with make_executor(executor, workers) as pool:
+        running = {}  # future -> 序号
+        for index, job in enumerate(jobs):
+            profile_path = os.path.join(profile_dir, f"item-{index}.prof") if profile_dir else None
+            running[pool.submit(_measured_call, func, job.args, profile_path)] = index
+            if len(running) >= max(1, workers) * 2:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(running.pop(future), future)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                collect(running.pop(future), future)
+    return results
+
+
+_print_lock = threading.Lock()
+
+
+def print_item(stats, done, total):
+    """默认的单个任务结果输出"""
+    with _print_lock:
+        if stats.error:
+            print(f"❌ ({done}/{total}) {stats.label}: {stats.error}")
+        else:
+            note = f" - {stats.note}" if stats.note else ''
+            print(f"✅ ({done}/{total}) {stats.label} {stats.wall:.2f}s{note}")
+
+
+def summarize(items, elapsed):
+    """
+    汇总各任务的统计
+    :param items: ItemStats 列表
+    :param elapsed: 整批任务的墙钟时间（秒）
+    :return: 汇总字典
+    """
+    def total(field):
+        values = [getattr(item, field) for item in items if getattr(item, field) is not None]
+        return sum(values) if values else None
+
+    def peak(field):
+        values = [getattr(item, field) for item in items if getattr(item, field) is not None]
+        return max(values) if values else None
+
+    ok = sum(item.status == 'ok' for item in items)
+    return {'items': len(items), 'ok': ok, 'failed': len(items) - ok, 'elapsed': elapsed,
+            'items_per_second': ok / elapsed if elapsed else None, 'cpu': total('cpu'),
+            'read_bytes': total('read_bytes'), 'write_bytes': total('write_bytes'),
+            'peak_rss': peak('peak_rss'), 'child_peak_rss': peak('child_peak_rss')}
+
+
+def _size(value):
+    """把字节数格式化为 KiB/MiB"""
+    if value is None:
+        return '-'
+    return f"{value / 1024:.1f} KiB" if value < 1 << 20 else f"{value / (1 << 20):.1f} MiB"
+
+
+def print_summary(summary):
+    """打印汇总信息"""
+    rate = summary['items_per_second']
+    print(f"📊 {summary['items']} 项: 成功 {summary['ok']}, 失败 {summary['failed']}, "
+          f"耗时 {summary['elapsed']:.2f}s ({0 if rate is None else rate:.2f} 项/秒), "
+          f"CPU {summary['cpu'] or 0:.2f}s, 读取 {_size(summary['read_bytes'])}, 写入 {_size(summary['write_bytes'])}, "
+          f"峰值内存 {_size(summary['peak_rss'])} (子进程 {_size(summary['child_peak_rss'])})")
+
+
+def write_stats(path, report):
+    """把统计报告写入 JSON 文件"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def save_profile(output_path, profiles, limit=25):
+    """
+    合并多个 cProfile 结果，保存为一个 pstats 文件并打印累计耗时最多的函数
+    :param profiles: cProfile.Profile 对象或 .prof 文件路径的列表
+    :param limit: 打印的函数数量
+    """
+    import pstats
+
+    profiles = [p for p in profiles if not isinstance(p, str) or os.path.exists(p)]
+    if not profiles:
+        return
+    stats = pstats.Stats(profiles[0])
+    for profile in profiles[1:]:
+        stats.add(profile)
+    stats.dump_stats(output_path)
+    stats = pstats.Stats(output_path)  # 重新载入，打印时只列出合并后的文件
+    print(f"🔬 性能分析结果已保存到 {output_path}（可用 python -m pstats {output_path} 查看），累计耗时最多的函数:")
+    stats.sort_stats('cumulative').print_stats(limit)
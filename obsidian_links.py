@@ -0,0 +1,170 @@
+"""
+Obsidian 笔记链接提取器，供 `Obsidian 项目打包导出器.py` 使用（需放在同一目录下）。
+
+只用一个预编译的正则、一次遍历文件字节，识别以下几种链接：
+    [[笔记]]  [[笔记#标题|别名]]  [[笔记#^块]]   -> wikilink
+    ![[图片.png]]  ![[笔记#标题]]                -> embed
+    [文字](笔记.md)  [文字](<带 空格.md>)        -> mdlink
+    ![图片](附件/图片.png)                       -> mdembed
+链接只指向本笔记内的标题或块（如 [[#标题]]）时 target 为空，只有 anchor。
+代码块（``` 或 ~~~ 围起来的部分）和行内代码中的内容不算链接。
+
+大文件按块读取，内存占用与文件大小无关；编码只检测一次（utf-8，失败时回退到 gbk）。
+"""
+
+import codecs
+import hashlib
+import re
+from collections import namedtuple
+from urllib.parse import unquote
+
+WIKILINK = 'wikilink'
+EMBED = 'embed'
+MDLINK = 'mdlink'
+MDEMBED = 'mdembed'
+
+CHUNK_SIZE = 1 << 20  # 每次读取 1 MiB
+MAX_PENDING = 16 * CHUNK_SIZE  # 超长的单行也按块处理，保证内存上限
+
+# kind: 链接类型；target: 指向的笔记或附件（可能为空）；anchor: '#标题'、'#^块' 或 ''
+Link = namedtuple('Link', ['kind', 'target', 'anchor'])
+
+_TOKEN_RE = re.compile(r'''
+    (?=[`!\[ ~])                                        # 先用字符集快速跳过普通文字
+    (?:
+    ^[ ]{0,3}(?P<fence>`{3,}|~{3,})(?P<info>[^\n]*)     # 代码块围栏行
+  | (?P<code>`[^`\n]*`)                                 # 行内代码，跳过
+  | (?P<bang>!?)\[\[(?P<wiki>[^\[\]\n]+)\]\]            # [[...]] 或 ![[...]]
+  | (?P<mdbang>!?)\[(?:[^\[\]\n]|\[[^\[\]\n]*\])*\]     # [文字] 或 ![文字]
+    \(\s*(?:<(?P<angle>[^<>\n]+)>|(?P<url>[^\s()<>]+))  # (目标) 或 (<目标>)
+    (?:\s+(?:"[^"\n]*"|'[^'\n]*'))?\s*\)                # 可选的标题
+    )
+''', re.VERBOSE | re.MULTILINE)
+
+_ANCHOR_RE = re.compile(r'[#^]')
+_SCHEME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')  # http:、mailto:、obsidian: 等外部链接
+
+
+def _split_anchor(target):
+    """把 '笔记#标题' 拆成 ('笔记', '#标题')"""
+    m = _ANCHOR_RE.search(target)
+    if m is None:
+        return target.strip(), ''
+    return target[:m.start()].strip(), target[m.start():].strip()
+
+
+def _to_link(m):
+    """把一个链接匹配转换为 Link，外部链接返回 None"""
+    wiki = m.group('wiki')
+    if wiki is not None:
+        # 表格里的别名分隔符会写成 \|
+        target = wiki.split('|', 1)[0].rstrip('\\')
+        kind = EMBED if m.group('bang') else WIKILINK
+    else:
+        target = m.group('angle') or m.group('url')
+        if _SCHEME_RE.match(target):
+            return None
+        target = unquote(target)
+        kind = MDEMBED if m.group('mdbang') else MDLINK
+    target, anchor = _split_anchor(target)
+    if not target and not anchor:
+        return None
+    return Link(kind, target, anchor)
+
+
+def scan_blocks(blocks):
+    """
+    从文本块中提取链接，跳过代码块
+    :param blocks: 可迭代的文本块，每块都在行尾处断开
+    :return: Link 生成器
+    """
+    fence = None  # 当前所在代码块的围栏，例如 '```'
+    for text in blocks:
+        for m in _TOKEN_RE.finditer(text):
+            marker = m.group('fence')
+            if marker is not None:
+                if fence is None:
+                    fence = marker
+                elif marker[0] == fence[0] and len(marker) >= len(fence) and not m.group('info').strip():
+                    fence = None
+                continue
+            if fence is not None or m.group('code') is not None:
+                continue
+            link = _to_link(m)
+            if link is not None:
+                yield link
+
+
+def extract_links(text):
+    """
+    提取一段笔记文本中的全部链接
+    :param text: 笔记文本
+    :return: Link 列表，按出现顺序
+    """
+    return list(scan_blocks([text]))
+
+
+def detect_encoding(head):
+    """
+    根据文件开头的字节判断编码
+    :param head: 文件开头的一块字节
+    :return: 'utf-8-sig'、'utf-8' 或 'gbk'
+    """
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # 块末尾可能截断了一个多字节字符，用增量解码器忽略这种情况
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'gbk'
+
+
+def _iter_text_blocks(f, chunk_size, hasher):
+    """按块读取文件并解码，产出在行尾处断开的文本块"""
+    head = f.read(chunk_size)
+    if hasher is not None:
+        hasher.update(head)
+    # 编码只检测一次，后续块中偶尔出现的坏字节直接替换，不再重新读取文件
+    decoder = codecs.getincrementaldecoder(detect_encoding(head))(errors='replace')
+
+    pending = ''
+    chunk = head
+    while chunk:
+        pending += decoder.decode(chunk)
+        cut = pending.rfind('\n') + 1
+        if cut:
+            yield pending[:cut]
+            pending = pending[cut:]
+        elif len(pending) > MAX_PENDING:
+            yield pending
+            pending = ''
+        chunk = f.read(chunk_size)
+        if hasher is not None:
+            hasher.update(chunk)
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+def iter_links(path, chunk_size=CHUNK_SIZE, hasher=None):
+    """
+    流式提取文件中的链接
+    :param path: 笔记文件路径
+    :param chunk_size: 每次读取的字节数
+    :param hasher: 可选的 hashlib 对象，读取的原始字节会同时送入其中
+    :return: Link 生成器
+    """
+    with open(path, 'rb') as f:
+        yield from scan_blocks(_iter_text_blocks(f, chunk_size, hasher))
+
+
+def read_links(path, chunk_size=CHUNK_SIZE):
+    """
+    读取一次文件，同时得到内容哈希和全部链接
+    :param path: 笔记文件路径
+    :return: (哈希的十六进制字符串, Link 列表)
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    links = list(iter_links(path, chunk_size, hasher))
+    return hasher.hexdigest(), links
@@ -0,0 +1,56 @@
+"""
+载入仓库根目录下的工具脚本（文件名含中文、空格和括号，无法直接 import）
+
+脚本以本模块子模块的形式注册，例如 script_loader.image_resizer。以 spawn 方式启动的
+子进程（Windows、macOS 的默认方式）按函数所在的模块名重新导入，导入本模块时会装上
+下面的查找器，于是子进程同样能找到对应的脚本文件，进程池可以直接使用脚本中的函数。
+"""
+
+import importlib
+import importlib.abc
+import importlib.util
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+OBSIDIAN_EXPORTER = 'Obsidian 项目打包导出器.py'
+IMAGE_RESIZER = '修改照片大小（支持多照片，指定文件夹，指定格式）.py'
+AUDIO_EXTRACTOR = '视频声音分离（支持多视频，指定文件夹,  指定格式）.py'
+BILIBILI_DOWNLOADER = '下载B站视频（可选择性地下载和内嵌字幕）.py'
+
+# 子模块名 -> 脚本文件名
+SCRIPTS = {
+    'obsidian_exporter': OBSIDIAN_EXPORTER,
+    'image_resizer': IMAGE_RESIZER,
+    'audio_extractor': AUDIO_EXTRACTOR,
+    'bilibili_downloader': BILIBILI_DOWNLOADER,
+}
+
+# 使 script_loader.xxx 可以作为子模块导入
+__path__ = []
+
+
+class _ScriptFinder(importlib.abc.MetaPathFinder):
+    """把 script_loader.<子模块名> 映射到仓库根目录下的脚本文件"""
+
+    def find_spec(self, fullname, path=None, target=None):
+        package, _, name = fullname.rpartition('.')
+        if package != __name__ or name not in SCRIPTS:
+            return None
+        return importlib.util.spec_from_file_location(fullname, os.path.join(REPO_DIR, SCRIPTS[name]))
+
+
+if not any(isinstance(finder, _ScriptFinder) for finder in sys.meta_path):
+    sys.meta_path.append(_ScriptFinder())
+
+
+def load_script(name):
+    """
+    载入工具脚本
+    :param name: 子模块名，见 SCRIPTS
+    :return: 模块对象
+    """
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)  # 脚本可能依赖同目录下的辅助模块；子进程也按此路径找到本模块
+    return importlib.import_module(f'{__name__}.{name}')
@@ -0,0 +1,58 @@
+"""
+视频声音分离的分段输出测试：按静音分段时，短于一段或时长未知的视频应只输出一段，
+而不是退回 ffmpeg segment 默认的每 2 秒一段。
+
+python -m unittest discover tests
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from script_loader import load_script
+
+extractor = load_script('audio_extractor')
+FFMPEG, FFPROBE = extractor.find_ffmpeg()
+
+
+@unittest.skipIf(FFMPEG is None, '未找到 ffmpeg')
+class SilenceSegmentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='segment_test_')
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.video = os.path.join(self.work_dir, 'clip.mp4')
+        subprocess.run([FFMPEG, '-y', '-loglevel', 'error', '-f', 'lavfi', '-i', 'sine=frequency=440:duration=7',
+                        '-c:a', 'aac', self.video], check=True)
+
+    def extract(self):
+        output = os.path.join(self.work_dir, 'clip.m4a')
+        outputs, _ = extractor.extract_audio_ffmpeg(self.video, output, 'm4a', FFMPEG, FFPROBE, segment_time=30,
+                                                    split_on_silence=True)
+        self.assertEqual(len(outputs), 1)
+        return sorted(os.listdir(outputs[0][0]))
+
+    def test_clip_shorter_than_segment(self):
+        self.assertEqual(self.extract(), ['000.m4a'])
+
+    def test_unknown_duration(self):
+        probe = extractor.probe_media
+
+        def probe_without_duration(*args, **kwargs):
+            codecs, _ = probe(*args, **kwargs)
+            return codecs, 0.0
+
+        with mock.patch.object(extractor, 'probe_media', probe_without_duration):
+            self.assertEqual(self.extract(), ['000.m4a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+"""
+file_scanner 的测试：递归扫描时不跟随指向文件夹的符号链接，无法读取的条目记入 errors 而不是中断扫描。
+
+python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from file_scanner import scan_files
+
+
+class SymlinkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='scanner_test_')
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        os.makedirs(os.path.join(self.root, 'd'))
+        for rel_path in ('a.jpg', os.path.join('d', 'b.jpg')):
+            open(os.path.join(self.root, rel_path), 'wb').close()
+        try:
+            os.symlink('..', os.path.join(self.root, 'd', 'loop'), target_is_directory=True)
+            os.symlink('x.jpg', os.path.join(self.root, 'x.jpg'))  # 指向自身，读取时报 ELOOP
+        except (OSError, NotImplementedError):
+            self.skipTest('无法创建符号链接')
+
+    def test_symlink_loop(self):
+        errors = []
+        found = [f.rel_path for f in scan_files(self.root, ('.jpg',), recursive=True, errors=errors)]
+        self.assertEqual(found, ['a.jpg', os.path.join('d', 'b.jpg')])
+        self.assertEqual([rel_path for rel_path, _ in errors], ['x.jpg'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Obsidian 导出器监视模式的增量同步测试：结果必须与完整重新遍历一致，且只做必要的工作。
+
+python -m unittest discover tests
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from script_loader import load_script
+
+
+class SyncChangesTest(unittest.TestCase):
+    # 链式的笔记：note0 -> note1 -> ... -> note9，另有一个不在链上的 orphan
+    NOTES = 10
+
+    def setUp(self):
+        self.exporter = load_script('obsidian_exporter')
+        self.work_dir = tempfile.mkdtemp(prefix='watch_test_')
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.vault = os.path.join(self.work_dir, 'vault')
+        os.makedirs(self.vault)
+        for i in range(self.NOTES):
+            self.write(f'note{i}.md', f"# note{i}\n\n[[note{i + 1}]]\n" if i + 1 < self.NOTES else "# 结尾\n")
+        self.write('orphan.md', "# orphan\n")
+
+        saved = {name: getattr(self.exporter, name) for name in ('BASE_DIR', 'VAULT_DIR', 'resolver', 'link_index')}
+        self.addCleanup(lambda: [setattr(self.exporter, name, value) for name, value in saved.items()])
+        self.exporter.BASE_DIR, self.exporter.VAULT_DIR = self.vault, os.path.join(self.work_dir, 'export')
+
+    def write(self, rel_path, text):
+        with open(os.path.join(self.vault, rel_path), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def export(self, max_depth, failed=()):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.exporter.populate_notes_map()
+            self.exporter.link_index = self.exporter.LinkIndex(self.vault, persistent=False)
+            self.exporter.link_index.failed.update(failed)  # 模拟读取失败的笔记
+            graph = self.exporter.traverse_links(['note0'], max_depth)
+            self.exporter.make_new_vault(graph.nodes)
+        return graph
+
+    def sync(self, changed, max_depth, graph):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.exporter.sync_changes(set(changed), ['note0'], max_depth, graph)
+
+    def assertMatchesFullWalk(self, graph, max_depth):
+        with contextlib.redirect_stdout(io.StringIO()):
+            full = self.exporter.traverse_links(['note0'], max_depth)
+        self.assertEqual(graph.nodes, full.nodes)
+        self.assertEqual(graph.depth, full.depth)
+        self.assertEqual(sorted(graph.edges), sorted(full.edges))
+        exported = {os.path.relpath(os.path.join(root, name), self.exporter.VAULT_DIR)
+                    for root, _, files in os.walk(self.exporter.VAULT_DIR) for name in files}
+        self.assertEqual(exported, set(full.nodes))
+
+    def test_unrelated_file_does_not_rewalk(self):
+        graph = self.export(None)
+        self.write('.note3.md.swp', 'swap')
+        with mock.patch.object(self.exporter, 'traverse_links', wraps=self.exporter.traverse_links) as traverse:
+            new_graph = self.sync(['.note3.md.swp'], None, graph)
+            os.remove(os.path.join(self.vault, '.note3.md.swp'))
+            new_graph = self.sync(['.note3.md.swp'], None, new_graph)
+        self.assertEqual(traverse.call_count, 0)
+        self.assertIs(new_graph, graph)
+
+    def test_link_edit_reads_only_the_edited_note(self):
+        graph = self.export(3)
+        parsed = self.exporter.link_index.parsed
+        # note1 改为链接到 orphan：note2 之后的笔记不再可达，orphan 加入
+        self.write('note1.md', "# note1\n\n[[orphan]]\n")
+        graph = self.sync(['note1.md'], 3, graph)
+        self.assertEqual(self.exporter.link_index.parsed - parsed, 2)  # note1 和新链接到的 orphan
+        self.assertIn('orphan.md', graph.depth)
+        self.assertNotIn('note2.md', graph.depth)
+        self.assertMatchesFullWalk(graph, 3)
+
+        # 改回原来的链接，note2、note3 重新可达
+        self.write('note1.md', "# note1\n\n[[note2]]\n")
+        graph = self.sync(['note1.md'], 3, graph)
+        self.assertNotIn('orphan.md', graph.depth)
+        self.assertMatchesFullWalk(graph, 3)
+
+    def test_added_link_target_rewalks(self):
+        graph = self.export(None)
+        self.write('note9.md', "# note9\n\n[[later]]\n")
+        graph = self.sync(['note9.md'], None, graph)
+        self.write('later.md', "# later\n")
+        graph = self.sync(['later.md'], None, graph)
+        self.assertIn('later.md', graph.depth)
+        self.assertMatchesFullWalk(graph, None)
+
+    def test_failed_note_is_retried(self):
+        graph = self.export(None, failed=['note4.md'])
+        self.assertNotIn('note5.md', graph.depth)
+        graph = self.sync(['note4.md'], None, graph)
+        self.assertIn('note5.md', graph.depth)
+        self.assertMatchesFullWalk(graph, None)
+
+
+if __name__ == '__main__':
+    unittest.main()
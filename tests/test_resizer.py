@@ -0,0 +1,67 @@
+"""
+修改照片大小的批处理测试。
+
+python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from script_loader import load_script
+
+
+@unittest.skipIf(Image is None, '未安装 Pillow')
+class BatchResizeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.resizer = load_script('image_resizer')
+        self.work_dir = tempfile.mkdtemp(prefix='resizer_test_')
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.input = os.path.join(self.work_dir, 'images')
+        self.output = os.path.join(self.work_dir, 'out')
+        os.makedirs(self.input)
+
+    def resize(self):
+        return self.resizer.batch_resize_images(self.input, self.output, 32, 32, output_format='jpg')
+
+    def add_image(self, name):
+        Image.new('RGB', (64, 48), (200, 80, 40)).save(os.path.join(self.input, name))
+
+    def test_output_name_clash(self):
+        self.add_image('a.jpg')
+        self.add_image('a.png')
+        summary = self.resize()
+        self.assertEqual(summary['processed'], 1)
+        self.assertEqual([key for key, _ in summary['failed']], ['a.png'])
+        self.assertEqual(sorted(os.listdir(self.output)), ['.resize_manifest.json', 'a.jpg'])
+
+        # 删除被拒绝的那张图片，不能连带删掉另一张图片的输出
+        os.remove(os.path.join(self.input, 'a.png'))
+        summary = self.resize()
+        self.assertEqual((summary['skipped'], summary['removed']), (1, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.output, 'a.jpg')))
+
+    def test_failure_names_the_file(self):
+        with open(os.path.join(self.input, 'broken.jpg'), 'wb') as f:
+            f.write(b'not an image')
+        summary = self.resize()
+        self.assertEqual(len(summary['failed']), 1)
+        key, error = summary['failed'][0]
+        self.assertEqual(key, 'broken.jpg')
+        self.assertIn('broken.jpg', error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+进程池在 spawn 启动方式（Windows、macOS 的默认方式）下的回归测试：
+子进程要按模块名重新导入脚本中的函数，脚本以 script_loader 的子模块注册后才能找到。
+每个用例在独立的解释器中运行，以免改动当前进程的启动方式。
+
+python -m unittest discover tests
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_spawned(code, *argv):
+    """在新的解释器中以 spawn 启动方式运行 code，返回 CompletedProcess"""
+    source = "import multiprocessing\nmultiprocessing.set_start_method('spawn', force=True)\n" + textwrap.dedent(code)
+    return subprocess.run([sys.executable, '-c', source, *argv], cwd=REPO_DIR, capture_output=True, text=True,
+                          timeout=300)
+
+
+class SpawnTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp(prefix='spawn_test_')
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+
+    def assertSucceeded(self, result):
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+    def make_images(self, count=4):
+        try:
+            from PIL import Image
+        except ImportError:
+            self.skipTest('未安装 Pillow')
+        folder = os.path.join(self.work_dir, 'images')
+        os.makedirs(folder)
+        for i in range(count):
+            Image.new('RGB', (64, 48), (i * 40, 80, 160)).save(os.path.join(folder, f'img{i}.jpg'))
+        return folder
+
+    def make_vault(self, count=20):
+        vault = os.path.join(self.work_dir, 'vault')
+        os.makedirs(vault)
+        for i in range(count):
+            with open(os.path.join(vault, f'note{i}.md'), 'w', encoding='utf-8') as f:
+                f.write(f"# note{i}\n\n参见 [[note{(i + 1) % count}]] 和 [[note{(i * 7) % count}]]。\n")
+        return vault
+
+    def test_resizer_process_pool(self):
+        images = self.make_images()
+        output = os.path.join(self.work_dir, 'out')
+        result = run_spawned("""
+            import sys
+            from script_loader import load_script
+            resizer = load_script('image_resizer')
+            summary = resizer.batch_resize_images(sys.argv[1], sys.argv[2], 32, 32, workers=2)
+            sys.exit(1 if summary['failed'] else 0)
+        """, images, output)
+        self.assertSucceeded(result)
+        self.assertEqual(len([name for name in os.listdir(output) if name.endswith('.jpg')]), 4)
+
+    def test_toolbox_resize_process_executor(self):
+        images = self.make_images()
+        output = os.path.join(self.work_dir, 'out')
+        result = run_spawned("""
+            import sys
+            from toolbox import run_tool
+            report = run_tool('resize', [sys.argv[1], sys.argv[2], '--width', '32', '--height', '32', '-f', 'jpg'],
+                              executor='process', workers=2)
+            sys.exit(0 if report['summary']['failed'] == 0 else 1)
+        """, images, output)
+        self.assertSucceeded(result)
+        self.assertEqual(len([name for name in os.listdir(output) if name.endswith('.jpg')]), 4)
+
+    def test_toolbox_obsidian_process_pool(self):
+        vault = self.make_vault()
+        output = os.path.join(self.work_dir, 'export')
+        result = run_spawned("""
+            import sys
+            from toolbox import run_tool
+
+            def configure(module):
+                module.BASE_DIR, module.VAULT_DIR = sys.argv[1], sys.argv[2]
+
+            report = run_tool('obsidian', ['--all', '--no-index', '--pool', 'process', '-j', '2', 'note0'],
+                              executor='process', workers=2, configure=configure)
+            sys.exit(0 if report['summary']['failed'] == 0 else 1)
+        """, vault, output)
+        self.assertSucceeded(result)
+        exported = [name for _, _, files in os.walk(output) for name in files if name.endswith('.md')]
+        self.assertEqual(len(exported), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
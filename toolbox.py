@@ -0,0 +1,263 @@
+"""
+四个工具脚本的统一命令行入口：用同一套参数（或 JSON 配置文件）运行任意一个工具，
+由 job_runner 以可替换的执行器逐项执行，并记录每一项的耗时、CPU 时间、读写字节数和峰值内存。
+
+工具名之后的参数原样交给对应脚本自己的参数解析，用法与直接运行脚本相同:
+    python toolbox.py resize input_images output_images --width 1920 --height 1080 -f jpg
+    python toolbox.py -e thread -w 8 --stats stats.json audio input_videos output_audio -f m4a
+    python toolbox.py --profile download.prof download https://www.bilibili.com/video/BV...
+    python toolbox.py obsidian -n 2 "git&github协作版本控制.md"
+    python toolbox.py --config job.json
+
+配置文件示例（命令行中给出的选项优先）:
+    {"tool": "resize", "executor": "process", "workers": 4, "stats": "stats.json",
+     "args": ["input_images", "output_images", "-f", "webp"]}
+
+与直接运行脚本的区别：每个文件/URL 都作为独立的一项执行，因此不使用处理清单和下载记录
+（每次都完整处理，便于比较耗时），也不支持 Obsidian 导出器的 --archive / --watch / --prune。
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+from job_runner import EXECUTORS, Job, print_summary, run_jobs, save_profile, summarize, write_stats
+from script_loader import load_script
+
+# executor: 默认执行器；workers: 脚本中表示并发数的参数名；脚本文件见 script_loader.SCRIPTS
+Tool = namedtuple('Tool', ['module', 'executor', 'workers', 'prepare', 'description'])
+
+
+def load_tool(name):
+    """载入工具对应的脚本"""
+    tool = TOOLS[name]
+    return load_script(tool.module)
+
+
+# --- 各工具的单项任务：在工作线程/进程中执行，必须是模块顶层函数 ---
+
+def _resize_task(task_name, *args):
+    """缩放一张图片（task_name 为 '_resize_task' 或多规格模式的 '_render_task'）"""
+    _, description, notes, _ = getattr(load_tool('resize'), task_name)(*args)
+    return '; '.join([description] + notes)
+
+
+def _audio_task(*args):
+    """从一个视频中提取音频"""
+    outputs, duration, note = load_tool('audio').extract_one(*args)
+    if not outputs:
+        return '不包含音频轨道，已跳过'
+    return f"{len(outputs)} 个输出, 时长 {duration:.1f} 秒" + (f" ({note})" if note else '')
+
+
+def _download_task(*args):
+    """下载一个URL"""
+    if not load_tool('download').download_bilibili_video(*args):
+        raise RuntimeError('下载失败，详见上方输出')
+
+
+def _export_task(*args):
+    """导出一个笔记文件"""
+    return load_tool('obsidian')._export_one(*args)
+
+
+# --- 各工具的任务准备：解析好的脚本参数 -> (任务函数, Job 列表) ---
+
+def _check_input_folder(folder):
+    """输入文件夹不存在时在创建任何输出之前退出"""
+    if not os.path.isdir(folder):
+        raise SystemExit(f"❌ 错误: 输入文件夹不存在: {folder}")
+
+
+def _prepare_resize(module, args):
+    from file_scanner import IMAGE_EXTENSIONS, scan_files
+
+    _check_input_folder(args.input_folder)
+    os.makedirs(args.output_folder, exist_ok=True)
+    if args.rendition:
+        renditions = [(w, h, fmt.lower(), q) for w, h, fmt, q in args.rendition]
+        task_name, task_args = '_render_task', (args.output_folder, renditions, args.preset)
+    else:
+        task_name = '_resize_task'
+        task_args = (args.output_folder, args.width, args.height, args.format, args.preset, args.quality)
+    found = scan_files(args.input_folder, IMAGE_EXTENSIONS, recursive=args.recursive, include=args.include,
+                       exclude=args.exclude, skip_dirs=[args.output_folder])
+    jobs = []
+    claimed = {}  # 去掉扩展名的相对路径 -> 相对路径，a.jpg 和 a.png 会写到同一个输出
+    for path, rel_path, _ in found:
+        stem = os.path.normcase(os.path.splitext(rel_path)[0])
+        if stem in claimed:
+            print(f"⚠️ 跳过 {rel_path}: 输出文件与 '{claimed[stem]}' 相同")
+            continue
+        claimed[stem] = rel_path
+        jobs.append(Job(rel_path, (task_name, path, os.path.dirname(rel_path)) + task_args))
+    return _resize_task, jobs
+
+
+def _prepare_audio(module, args):
+    from file_scanner import VIDEO_EXTENSIONS, scan_files
+
+    _check_input_folder(args.input_folder)
+    ffmpeg, ffprobe = module.find_ffmpeg() if args.backend != 'moviepy' else (None, None)
+    if args.backend == 'ffmpeg' and ffmpeg is None:
+        raise SystemExit("❌ 错误: 未找到 ffmpeg，请安装 ffmpeg 或使用 --backend moviepy")
+    found = scan_files(args.input_folder, VIDEO_EXTENSIONS, recursive=args.recursive, include=args.include,
+                       exclude=args.exclude, skip_dirs=[args.output_folder])
+    jobs = []
+    claimed = {}  # 输出路径 -> 相对路径
+    for path, rel_path, _ in found:
+        output_path = os.path.join(args.output_folder, f"{os.path.splitext(rel_path)[0]}.{args.format}")
+        key = os.path.normcase(os.path.abspath(output_path))
+        if key in claimed:
+            print(f"⚠️ 跳过 {rel_path}: 输出文件与 '{claimed[key]}' 相同")
+            continue
+        claimed[key] = rel_path
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        jobs.append(Job(rel_path, (path, output_path, args.format, args.backend, ffmpeg, ffprobe, args.timeout,
+                                   args.tracks, args.segment, args.split_on_silence)))
+    return _audio_task, jobs
+
+
+def _prepare_download(module, args):
+    urls = list(args.urls)
+    if args.batch_file:
+        urls += module.read_url_file(args.batch_file)
+    if not urls:
+        raise SystemExit("❌ 错误: 请在命令行中给出URL，或用 -a 指定URL列表文件")
+    if args.limit_rate:
+        print("⚠️ 提示: 通过 toolbox 运行时每个URL单独限速，-r/--limit-rate 不是所有任务共用的总带宽")
+    return _download_task, [Job(url, (url, args.output, not args.no_subtitle, args.profile, args.limit_rate,
+                                      args.events, args.subtitle_mode)) for url in urls]
+
+
+def _prepare_obsidian(module, args):
+    if args.archive or args.watch or args.prune:
+        print("⚠️ 提示: 通过 toolbox 运行时只导出到文件夹，忽略 --archive / --watch / --prune")
+    if not args.seeds:
+        raise SystemExit("❌ 错误: 请在命令行中给出种子文件")
+    if args.rebuild_index and os.path.exists(os.path.join(module.BASE_DIR, module.INDEX_FILE)):
+        os.remove(os.path.join(module.BASE_DIR, module.INDEX_FILE))
+
+    module.populate_notes_map(case_insensitive=args.ignore_case)
+    print(f"找到 {len(module.resolver)} 个文件")
+    seeds = module.validate_seeds(args.seeds)
+    if not seeds:
+        raise SystemExit("❌ 错误: 没有有效的种子文件")
+    max_depth = None if args.all else (args.depth or 0)
+    module.link_index = module.LinkIndex(module.BASE_DIR, persistent=not args.no_index)
+    graph = module.traverse_links(seeds, max_depth=max_depth, jobs=args.jobs, pool=args.pool)
+    if not args.no_index:
+        module.link_index.save(known_paths=set(module.resolver.files()))
+    print(f'创建新知识库在: {module.VAULT_DIR}/')
+    return _export_task, [Job(os.path.relpath(src, module.BASE_DIR), (src, dest, args.link_mode, args.checksum))
+                          for src, dest in module.plan_export(graph.nodes)]
+
+
+TOOLS = {
+    'resize': Tool('image_resizer', 'process', 'workers', _prepare_resize, '批量缩放图片'),
+    'audio': Tool('audio_extractor', 'thread', 'workers', _prepare_audio, '批量提取音频'),
+    'download': Tool('bilibili_downloader', 'thread', 'workers', _prepare_download, '下载B站视频'),
+    'obsidian': Tool('obsidian_exporter', 'thread', 'jobs', _prepare_obsidian,
+                     '导出 Obsidian 笔记及其链接'),
+}
+
+
+def run_tool(name, tool_argv=(), executor=None, workers=None, stats_file=None, profile_file=None,
+             configure=None):
+    """
+    运行一个工具并返回统计报告
+    :param name: 工具名，见 TOOLS
+    :param tool_argv: 交给脚本自身参数解析的参数列表
+    :param executor: 'serial'、'thread' 或 'process'，None 表示使用该工具的默认执行器
+    :param workers: 工作者数量，None 表示使用脚本参数中的 -j 值
+    :param stats_file: 可选的 JSON 统计报告路径
+    :param profile_file: 可选的 pstats 输出路径，对准备阶段和每一项任务做 cProfile 分析
+    :param configure: 可选的回调，在准备任务之前以脚本模块为参数调用，例如修改知识库路径
+    :return: 报告字典 {'tool', 'executor', 'workers', 'prepare', 'summary', 'items'}
+    """
+    tool = TOOLS[name]
+    module = load_tool(name)
+    args = module.parse_arguments(list(tool_argv))
+    executor = executor or tool.executor
+    workers = workers or getattr(args, tool.workers) or 1
+    if configure:
+        configure(module)
+
+    if profile_file and executor == 'thread' and sys.version_info >= (3, 12):
+        # 3.12 起同一时间只能有一个 cProfile 在运行，无法在多个线程中分别分析
+        print("⚠️ 提示: Python 3.12+ 无法同时分析多个线程，性能分析时改用 serial 执行器")
+        executor = 'serial'
+    profile_dir = profiler = None
+    if profile_file:
+        import cProfile
+        profile_dir = tempfile.mkdtemp(prefix='toolbox_profile_')
+        profiler = cProfile.Profile()
+
+    try:
+        start = time.perf_counter()
+        if profiler:
+            task, jobs = profiler.runcall(tool.prepare, module, args)
+        else:
+            task, jobs = tool.prepare(module, args)
+        prepare_time = time.perf_counter() - start
+
+        print(f"🚀 {tool.description}: {len(jobs)} 项，执行器 {executor}，{workers} 个工作者")
+        start = time.perf_counter()
+        items = run_jobs(task, jobs, executor=executor, workers=workers, profile_dir=profile_dir)
+        summary = summarize(items, time.perf_counter() - start)
+        print_summary(summary)
+
+        report = {'tool': name, 'argv': list(tool_argv), 'executor': executor, 'workers': workers,
+                  'prepare': prepare_time, 'summary': summary, 'items': [item._asdict() for item in items]}
+        if stats_file:
+            write_stats(stats_file, report)
+            print(f"📝 统计已写入 {stats_file}")
+        if profile_file:
+            save_profile(profile_file, [profiler] + [os.path.join(profile_dir, f"item-{i}.prof")
+                                                     for i in range(len(jobs))])
+        return report
+    finally:
+        if profile_dir:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+def parse_arguments(argv=None):
+    """解析统一入口的参数，工具名之后的参数原样交给对应的脚本"""
+    parser = argparse.ArgumentParser(
+        description='工具脚本的统一入口：逐项执行并记录耗时、CPU、读写字节数和峰值内存',
+        epilog='工具名之后的参数与直接运行对应脚本时相同，例如: python toolbox.py resize input_images out -f jpg')
+    parser.add_argument('-c', '--config', help='JSON 配置文件，键与下面的选项同名，另有 tool 和 args')
+    parser.add_argument('-e', '--executor', choices=EXECUTORS,
+                        help='执行器 (默认: resize 用 process，其余用 thread)')
+    parser.add_argument('-w', '--workers', type=int, help='工作者数量 (默认: 脚本自己的 -j 参数值)')
+    parser.add_argument('--stats', metavar='FILE', help='把每一项的统计写入 JSON 文件')
+    parser.add_argument('--profile', metavar='FILE', help='用 cProfile 分析，把合并后的 pstats 结果写入 FILE')
+    parser.add_argument('tool', nargs='?', choices=list(TOOLS), help='要运行的工具')
+    parser.add_argument('tool_args', nargs=argparse.REMAINDER, help='交给工具脚本的参数')
+    options = parser.parse_args(argv)
+
+    if options.config:
+        with open(options.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        for key in ('tool', 'executor', 'workers', 'stats', 'profile'):
+            if getattr(options, key) is None:
+                setattr(options, key, config.get(key))
+        if not options.tool_args:
+            options.tool_args = list(config.get('args', []))
+    if options.tool not in TOOLS:
+        parser.error(f"请指定要运行的工具: {', '.join(TOOLS)}")
+    if options.executor is not None and options.executor not in EXECUTORS:
+        parser.error(f"未知的执行器: {options.executor}")
+    return options
+
+
+if __name__ == '__main__':
+    options = parse_arguments()
+    report = run_tool(options.tool, options.tool_args, executor=options.executor, workers=options.workers,
+                      stats_file=options.stats, profile_file=options.profile)
+    sys.exit(1 if report['summary']['failed'] else 0)
@@ -5,99 +5,708 @@ ffmpeg部分请查看README文档
 ----------------------------------------------------------------------------------
 """
 
-import yt_dlp
+# yt_dlp 载入需要几百毫秒（提取器注册表很大），只在真正下载时才导入，--help 和参数错误不必等待
+import os
 import sys
+import json
+import time
+import queue
+import argparse
+import functools
+import threading
 
+# --- 下载性能预设 ---
+# concurrent_fragment_downloads: DASH/HLS 分片视频同时下载的分片数
+# http_chunk_size: 把大文件拆成多个 Range 请求下载（可以绕过部分服务器对单个连接的限速），None 表示一次请求
+# retries / fragment_retries: 出错重试次数，重试间隔按指数退避增长，最长 backoff_max 秒
+# rate_limit: 默认的总带宽上限（字节/秒），None 表示不限制
+PROFILES = {
+    'fast': {'concurrent_fragment_downloads': 8, 'http_chunk_size': 10 << 20, 'retries': 10,
+             'fragment_retries': 10, 'backoff_max': 10, 'rate_limit': None},
+    'balanced': {'concurrent_fragment_downloads': 4, 'http_chunk_size': 10 << 20, 'retries': 10,
+                 'fragment_retries': 10, 'backoff_max': 30, 'rate_limit': None},
+    'polite': {'concurrent_fragment_downloads': 1, 'http_chunk_size': None, 'retries': 5,
+               'fragment_retries': 5, 'backoff_max': 60, 'rate_limit': 2 << 20},
+}
 
-def download_bilibili_video(video_url, output_path='./', download_subtitle=False):
+# --- 字幕处理方式 ---
+# embed: 先合并音视频，再由 EmbedSubtitle 把字幕写入视频（整个文件会被写两遍）
+# mux: 分别下载视频流和音频流，由一次 ffmpeg 调用同时合并音视频和字幕（只写一遍）
+# sidecar: 只把字幕转换为同名的 .srt 文件放在视频旁边，不改动视频文件
+SUBTITLE_MODES = ('embed', 'mux', 'sidecar')
+
+
+def download_bilibili_video(video_url, output_path='./', download_subtitle=False, profile='balanced',
+                            rate_limit=None, events_file=None, subtitle_mode='embed'):
     """
     使用 yt-dlp 下载B站视频，并可选择性地下载和内嵌字幕。
 
     :param video_url: B站视频的URL。
     :param output_path: 视频保存的路径。
     :param download_subtitle: 布尔值。如果为True，则尝试下载中文字幕并内嵌到视频文件中。
+    :param profile: 下载性能预设: 'fast'、'balanced' 或 'polite'，见 PROFILES。
+    :param rate_limit: 带宽上限（字节/秒），None 表示使用预设的默认值。
+    :param events_file: 可选的 JSON lines 事件文件路径，记录下载、合并、内嵌字幕各阶段的开始和结束。
+    :param subtitle_mode: 字幕处理方式: 'embed'、'mux' 或 'sidecar'，见 SUBTITLE_MODES。
+    :return: 下载成功返回 True，出错返回 False
     """
+    ydl_opts = build_ydl_opts(output_path, download_subtitle, profile, subtitle_mode)
+    progress = ProgressAggregator(events_file=events_file)
+    ydl_opts.update({'noprogress': True, 'progress_hooks': [progress.hook],
+                     'postprocessor_hooks': [progress.postprocessor_hook]})
+    limiter = BandwidthLimiter.for_profile(profile, rate_limit)
+    if limiter is not None:
+        ydl_opts['progress_hooks'].append(limiter.hook)
+
+    print(f"准备下载: {video_url}")
+    print(f"保存至: {output_path}")
+
+    import yt_dlp
+    try:
+        with open_downloader(yt_dlp.YoutubeDL, ydl_opts, download_subtitle and subtitle_mode == 'mux') as ydl:
+            ydl.download([video_url])
+        progress.close()
+        print(f"\n下载完成! ({format_phases(progress.totals()['phases'])})")
+        return True
+    except Exception as e:
+        progress.close()
+        print(f"\n下载出错: {e}")
+        # 在调试时，可以取消下面这行注释来查看完整的错误信息
+        # traceback.print_exc()
+        return False
+
+
+def build_ydl_opts(output_path='./', download_subtitle=False, profile='balanced', subtitle_mode='embed'):
+    """
+    生成单个下载和批量下载共用的 yt-dlp 配置。
+
+    :param output_path: 视频保存的路径。
+    :param download_subtitle: 是否下载中文字幕并内嵌到视频文件中。
+    :param profile: 下载性能预设，见 PROFILES。
+    :param subtitle_mode: 字幕处理方式，见 SUBTITLE_MODES。'mux' 模式还需要用 open_downloader() 创建下载器。
+    :return: yt-dlp 配置字典（不含进度回调和带宽限制）
+    """
+    settings = PROFILES[profile]
+    backoff_max = settings['backoff_max']
     # --- yt-dlp 基础配置选项 ---
     ydl_opts = {
         # 选择最佳画质的mp4视频和最佳音质的m4a音频进行合并
         # 'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
         # 输出文件名模板，包含标题和UP主
-        'outtmpl': f'{output_path}%(title)s - %(uploader)s.%(ext)s',
+        'outtmpl': os.path.join(output_path, '%(title)s - %(uploader)s.%(ext)s'),
         # 对于需要登录才能观看高清视频或有地区限制的视频，需要配置cookie
         # 'cookiefile': 'path/to/your/cookies.txt',
-        # 设置进度回调函数
-        'progress_hooks': [progress_hook],
+        # 中断后再次运行时从 .part 文件继续下载
+        'continuedl': True,
+        # --- 性能预设 ---
+        'concurrent_fragment_downloads': settings['concurrent_fragment_downloads'],
+        'http_chunk_size': settings['http_chunk_size'],
+        'retries': settings['retries'],
+        'fragment_retries': settings['fragment_retries'],
+        # 第 n 次重试前等待 1, 2, 4, 8 ... 秒，不超过 backoff_max
+        'retry_sleep_functions': {
+            'http': lambda n: min(2 ** n, backoff_max),
+            'fragment': lambda n: min(2 ** n, backoff_max),
+        },
     }
 
     # --- 根据需求，动态添加字幕配置 ---
     if download_subtitle:
-        print("-> 已启用字幕下载功能，将尝试下载并内嵌中文字幕。")
         subtitle_options = {
             'writesubtitles': True,  # 开启字幕下载
             'subtitleslangs': ['zh-Hans', 'zh-CN', 'zh'],  # 尝试的字幕语言列表（简体中文的多种代码）
             'writeautomaticsub': False,  # 不下载自动生成的字幕
-            'embedsubtitles': True,  # **关键：将字幕内嵌到视频文件中**
         }
+        if subtitle_mode == 'embed':
+            print("-> 已启用字幕下载功能，将尝试下载并内嵌中文字幕。")
+            # **关键：将字幕内嵌到视频文件中**（通过 API 调用时 embedsubtitles 选项不生效，需要显式添加后处理器）
+            subtitle_options['postprocessors'] = [{'key': 'FFmpegEmbedSubtitle', 'already_have_subtitle': False}]
+        elif subtitle_mode == 'mux':
+            print("-> 已启用字幕下载功能，音视频和字幕将一次合并写入。")
+            subtitle_options.update({
+                'subtitlesformat': 'srt/best',
+                # 视频流和音频流分别下载，不经过 Merger，由 SingleMuxPP 一次完成合并
+                'format': 'bv*,ba/b',
+                # 中间文件带上格式编号以免重名；字幕文件名不带，两个流共用同一份字幕
+                'outtmpl': {'default': os.path.join(output_path, '%(title)s - %(uploader)s.f%(format_id)s.%(ext)s'),
+                            'subtitle': os.path.join(output_path, '%(title)s - %(uploader)s.%(ext)s')},
+            })
+        else:
+            print("-> 已启用字幕下载功能，字幕将保存为单独的 .srt 文件。")
+            subtitle_options.update({
+                'subtitlesformat': 'srt/best',
+                'postprocessors': [{'key': 'FFmpegSubtitlesConvertor', 'format': 'srt', 'when': 'before_dl'}],
+            })
         # 将字幕选项更新到主配置中
         ydl_opts.update(subtitle_options)
     else:
         print("-> 未启用字幕下载功能。")
+    return ydl_opts
 
-    print(f"准备下载: {video_url}")
-    print(f"保存至: {output_path}")
 
+class SingleMuxPP:
+    """
+    在一个视频的所有格式都下载完之后（when='after_video'），用一次 ffmpeg 调用把视频流、音频流和字幕
+    合并成最终文件。相比 Merger + EmbedSubtitle，成品只写一遍，省去一次完整的磁盘重写。
+    基类 FFmpegPostProcessor 来自 yt_dlp，由 _single_mux_pp_class() 在第一次使用时组合。
+    """
+
+    MP4_EXTS = ('mp4', 'm4v', 'm4a', 'mov')
+    archive_path = None  # 下载记录文件，由 open_downloader() 设置；合并成功后才写入
+
+    def run(self, info):
+        from yt_dlp.utils import ISO639Utils, locked_file, make_archive_id, prepend_extension
+
+        inputs, maps, exts = [], [], []
+        has_video = has_audio = False
+        for download in info.get('requested_downloads') or []:
+            path = download.get('filepath')
+            if not path or path in inputs or not os.path.exists(path):
+                continue
+            index = len(inputs)
+            inputs.append(path)
+            exts.append(download.get('ext'))
+            if download.get('vcodec') != 'none' and not has_video:
+                maps += ['-map', f'{index}:v:0']
+                has_video = True
+            if download.get('acodec') != 'none' and not has_audio:
+                maps += ['-map', f'{index}:a:0?']
+                has_audio = True
+        if not inputs:
+            return [], info
+
+        # 字幕已由 MoveFiles 按 'subtitle' 模板移动到 “成品名.语言.扩展名”
+        base = self._output_base(info, inputs[0])
+        subtitles = []
+        for lang, sub in (info.get('requested_subtitles') or {}).items():
+            path = f"{base}.{lang}.{sub.get('ext')}"
+            if os.path.exists(path):
+                language = ISO639Utils.short2long(lang.split('-')[0]) or lang  # 容器要求三字母语言代码
+                maps += ['-map', f'{len(inputs)}:0', f'-metadata:s:s:{len(subtitles)}', f'language={language}']
+                subtitles.append(path)
+                inputs.append(path)
+
+        ext = 'mp4' if all(e in self.MP4_EXTS for e in exts) else 'mkv'
+        final_path = f"{base}.{ext}"
+        temp_path = prepend_extension(final_path, 'temp')
+        options = maps + ['-c', 'copy'] + (['-c:s', 'mov_text'] if ext == 'mp4' and subtitles else [])
+        self.to_screen(f'Muxing {len(inputs) - len(subtitles)} stream(s) and {len(subtitles)} subtitle(s) '
+                       f'into "{final_path}"')
+        self.run_ffmpeg_multiple_files(inputs, temp_path, options)
+        os.replace(temp_path, final_path)
+        if self.archive_path and info.get('extractor_key') and info.get('id'):
+            with locked_file(self.archive_path, 'a', encoding='utf-8') as f:
+                f.write(make_archive_id(info['extractor_key'], info['id']) + '\n')
+
+        info['filepath'] = final_path
+        info['ext'] = ext
+        info['__files_to_move'] = {}
+        return [path for path in inputs if path != final_path], info
+
+    @staticmethod
+    def _output_base(info, first_input):
+        """去掉中间文件名中的 '.f格式编号.扩展名'，得到成品的文件名（不含扩展名）"""
+        base = os.path.splitext(first_input)[0]
+        for download in info.get('requested_downloads') or []:
+            suffix = f".f{download.get('format_id')}"
+            if base.endswith(suffix):
+                return base[:-len(suffix)]
+        return base
+
+
+@functools.lru_cache(maxsize=None)
+def _single_mux_pp_class():
+    """
+    把 SingleMuxPP 与 yt_dlp 的 FFmpegPostProcessor 组合成真正的后处理器类（类名决定后处理器的名称 SingleMux）。
+    yt_dlp 的元类只给类体中定义的 run 挂上开始/结束回调，因此要把 run 显式放进类体，阶段计时才能统计到
+    """
+    from yt_dlp.postprocessor.ffmpeg import FFmpegPostProcessor
+    return type('SingleMuxPP', (SingleMuxPP, FFmpegPostProcessor), {'run': SingleMuxPP.run})
+
+
+def open_downloader(ydl_factory, ydl_opts, single_mux=False):
+    """
+    创建下载器；single_mux 为 True 时（字幕处理方式为 'mux'）挂上 SingleMuxPP
+    :param ydl_factory: 根据配置字典创建下载器的函数，例如 yt_dlp.YoutubeDL
+    """
+    archive_path = ydl_opts.get('download_archive') if single_mux else None
+    if isinstance(archive_path, str):
+        # yt-dlp 在运行 after_video 后处理器之前就写入下载记录，一次合并失败或被中断时，只留下 .fNNN 中间文件，
+        # 视频却已被记为下载完成，之后每次运行都会跳过。这里只把已有的记录（内存中的集合）交给 yt-dlp 用于跳过，
+        # 由 SingleMuxPP 在合并成功后再写入文件
+        ydl_opts = dict(ydl_opts, download_archive=read_archive(archive_path))
+    else:
+        archive_path = None
+    ydl = ydl_factory(ydl_opts)
+    if single_mux:
+        pp = _single_mux_pp_class()(ydl)
+        pp.archive_path = archive_path
+        ydl.add_post_processor(pp, when='after_video')
+    return ydl
+
+
+def read_archive(path):
+    """读取下载记录文件中的条目（'extractor 视频id'），文件不存在时返回空集合"""
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([video_url])
-        print("\n下载完成!")
-    except Exception as e:
-        print(f"\n下载出错: {e}")
-        # 在调试时，可以取消下面这行注释来查看完整的错误信息
-        # traceback.print_exc()
+        with open(path, 'r', encoding='utf-8') as f:
+            return {line.strip() for line in f if line.strip()}
+    except FileNotFoundError:
+        return set()
+
+
+def read_url_file(path):
+    """
+    读取URL列表文件：每行一个URL（视频、合集、收藏夹均可），空行和 # 开头的行会被忽略
+    :return: URL列表
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+def parse_rate(text):
+    """把 '500K'、'2M'、'1.5M' 这样的带宽写法转换为字节/秒"""
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    text = text.strip().upper().rstrip('B')
+    try:
+        if text and text[-1] in units:
+            return int(float(text[:-1]) * units[text[-1]])
+        return int(float(text))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无法解析带宽: {text}，应为例如 500K、2M")
+
 
+class BandwidthLimiter:
+    """
+    令牌桶带宽限制，可以被多个下载（包括批量下载的所有线程和并发分片）共用，限制的是总带宽。
+    yt-dlp 的 ratelimit 只限制单个下载，这里通过进度回调统计新下载的字节数，
+    超出配额时在下载线程中等待，从而让总速度不超过上限。
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        :param rate: 带宽上限（字节/秒）
+        :param burst: 允许的突发字节数，默认为 1 秒的配额
+        """
+        self.rate = rate
+        self.burst = burst or rate
+        self.tokens = self.burst
+        self.last = time.monotonic()
+        self.seen = {}  # 文件名 -> 已统计的字节数
+        self.lock = threading.Lock()
+
+    @classmethod
+    def for_profile(cls, profile, rate_limit=None):
+        """按预设和显式指定的带宽创建限制器，不限速时返回 None"""
+        rate = rate_limit or PROFILES[profile]['rate_limit']
+        return cls(rate) if rate else None
+
+    def consume(self, amount):
+        """取用 amount 字节的配额，配额不足时等待"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= amount
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+
+    def hook(self, d):
+        """yt-dlp 进度回调：统计自上次回调以来新下载的字节数"""
+        if d['status'] not in ('downloading', 'finished'):
+            return
+        filename = d.get('filename')
+        downloaded = d.get('downloaded_bytes') or 0
+        with self.lock:
+            previous = self.seen.get(filename)
+            self.seen[filename] = downloaded
+            if d['status'] == 'finished':
+                del self.seen[filename]
+        # 第一次回调时的字节数可能来自续传的 .part 文件，不计入
+        if previous is not None and downloaded > previous:
+            self.consume(downloaded - previous)
+
+
+class _DownloadWorker:
+    """
+    批量下载的工作线程：整个生命周期只创建一个 YoutubeDL 实例，从队列中逐个取URL下载。
+    合集/收藏夹只做扁平解析，把其中的视频放回队列，由空闲的线程并发下载。
+    """
+
+    def __init__(self, name, tasks, results, lock, ydl_opts, ydl_factory, progress, limiter=None, single_mux=False):
+        self.name = name
+        self.tasks = tasks
+        self.results = results
+        self.lock = lock
+        self.progress = progress
+        self.current = None  # 正在下载的条目的统计
+        hooks = [self._hook] + ([limiter.hook] if limiter is not None else [])
+        opts = dict(ydl_opts, progress_hooks=hooks, postprocessor_hooks=[progress.postprocessor_hook])
+        self.ydl = open_downloader(ydl_factory, opts, single_mux)
+
+    def _hook(self, d):
+        """交给进度汇总器，并收集当前条目本次实际传输的字节数和文件名"""
+        transferred = self.progress.hook(d)
+        if d['status'] == 'finished' and self.current is not None:
+            self.current['bytes'] += transferred
+            self.current['files'].append(d.get('filename'))
+
+    def run(self):
+        with self.ydl:
+            while True:
+                task = self.tasks.get()
+                try:
+                    if task is None:
+                        return
+                    self._download(*task)
+                finally:
+                    self.tasks.task_done()
+
+    def _download(self, index, url):
+        item = {'index': index, 'url': url, 'status': 'ok', 'title': None, 'files': [], 'bytes': 0,
+                'elapsed': 0.0, 'speed': 0.0, 'phases': {}, 'error': None}
+        self.current = item
+        start = time.perf_counter()
+        try:
+            # 只解析一次：process=False 不会展开合集，也不会下载
+            info = self.ydl.extract_info(url, download=False, process=False)
+            if info.get('_type') in ('playlist', 'multi_video'):
+                entries = [entry.get('url') or entry.get('webpage_url') for entry in info.get('entries') or []]
+                entries = [entry for entry in entries if entry]
+                item['status'] = 'expanded'
+                item['title'] = info.get('title')
+                item['entries'] = len(entries)
+                for entry_url in entries:
+                    self._enqueue(entry_url)
+            elif self.ydl.in_download_archive(info):
+                item['status'] = 'skipped'
+                item['title'] = info.get('title')
+            else:
+                result = self.ydl.process_ie_result(info, download=True)
+                item['title'] = (result or info).get('title')
+                item['phases'] = self.progress.phases(info.get('id'))
+        except Exception as e:
+            item['status'] = 'error'
+            item['error'] = str(e)
+        finally:
+            self.current = None
+        item['elapsed'] = time.perf_counter() - start
+        if item['bytes'] and item['elapsed']:
+            item['speed'] = item['bytes'] / item['elapsed']
+        self._report(item)
+
+    def _enqueue(self, url):
+        with self.lock:
+            index = self.results['next_index']
+            self.results['next_index'] += 1
+        self.tasks.put((index, url))
+
+    def _report(self, item):
+        with self.lock:
+            self.results['items'].append(item)
+        label = item['title'] or item['url']
+        if item['status'] == 'ok':
+            self.progress.message(f"[{self.name}] ✅ 下载完成: {label} ({item['bytes'] / 1024 / 1024:.2f} MiB, "
+                                  f"{item['speed'] / 1024 / 1024:.2f} MiB/s, {format_phases(item['phases'])})")
+        elif item['status'] == 'skipped':
+            self.progress.message(f"[{self.name}] ⏭️ 已在下载记录中，跳过: {label}")
+        elif item['status'] == 'expanded':
+            self.progress.message(f"[{self.name}] 📂 合集 {label} 包含 {item['entries']} 个视频，已加入队列")
+        else:
+            self.progress.message(f"[{self.name}] ❌ 下载出错: {label} - {item['error']}")
+
+
+def batch_download(urls, output_path='./', download_subtitle=False, workers=3, archive_file='download_archive.txt',
+                   summary_file='download_summary.json', ydl_factory=None, profile='balanced', rate_limit=None,
+                   events_file=None, subtitle_mode='embed'):
+    """
+    批量下载多个视频，支持合集和收藏夹，并发下载，可断点续传。
+
+    :param urls: URL列表（视频、合集、收藏夹均可）。
+    :param output_path: 视频保存的路径。
+    :param download_subtitle: 是否下载中文字幕并内嵌到视频文件中。
+    :param workers: 同时下载的视频数，每个下载线程复用同一个 YoutubeDL 实例。
+    :param archive_file: 下载记录文件（相对路径放在 output_path 中），已下载的视频再次运行时会被跳过；None 表示不记录。
+    :param summary_file: JSON 汇总文件（相对路径放在 output_path 中），记录每个条目的状态、字节数和速度；None 表示不写。
+    :param ydl_factory: 根据配置字典创建下载器的函数，默认为 yt_dlp.YoutubeDL。
+                        可以替换为离线的替身对象，用于在没有网络的情况下测试调度逻辑。
+    :param profile: 下载性能预设: 'fast'、'balanced' 或 'polite'，见 PROFILES。
+    :param rate_limit: 所有下载线程共用的总带宽上限（字节/秒），None 表示使用预设的默认值。
+    :param events_file: 可选的 JSON lines 事件文件路径，见 ProgressAggregator。
+    :param subtitle_mode: 字幕处理方式: 'embed'、'mux' 或 'sidecar'，见 SUBTITLE_MODES。
+    :return: 汇总字典 {'elapsed': 总耗时, 'bytes': 总字节数, 'phases': {阶段: 累计秒数}, 'items': [每个条目的统计]}
+    """
+    if ydl_factory is None:
+        import yt_dlp
+        ydl_factory = yt_dlp.YoutubeDL
+    os.makedirs(output_path, exist_ok=True)
+    ydl_opts = build_ydl_opts(output_path, download_subtitle, profile, subtitle_mode)
+    limiter = BandwidthLimiter.for_profile(profile, rate_limit)
+    # 不打印 yt-dlp 自己的进度条，由 ProgressAggregator 汇总所有线程的进度并定时刷新
+    ydl_opts.update({'quiet': True, 'noprogress': True})
+    if archive_file:
+        ydl_opts['download_archive'] = os.path.join(output_path, archive_file)
+
+    workers = max(1, workers)
+    print(f"准备下载 {len(urls)} 个URL，同时下载 {workers} 个，预设 {profile}"
+          f"{f'，总带宽上限 {limiter.rate / 1024 / 1024:.2f} MiB/s' if limiter else ''}，保存至: {output_path}")
+
+    tasks = queue.Queue()
+    results = {'items': [], 'next_index': len(urls)}
+    lock = threading.Lock()
+    for index, url in enumerate(urls):
+        tasks.put((index, url))
+
+    start = time.perf_counter()
+    progress = ProgressAggregator(events_file=events_file)
+    threads = []
+    for i in range(workers):
+        worker = _DownloadWorker(f"#{i + 1}", tasks, results, lock, ydl_opts, ydl_factory, progress,
+                                 limiter=limiter, single_mux=download_subtitle and subtitle_mode == 'mux')
+        thread = threading.Thread(target=worker.run, name=f"download-{i + 1}", daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    tasks.join()  # 等待所有条目（包括合集展开后加入的视频）完成
+    for _ in threads:
+        tasks.put(None)
+    for thread in threads:
+        thread.join()
+    progress.close()
 
-def progress_hook(d):
-    """进度条回调函数"""
-    if d['status'] == 'downloading':
-        total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate')
-        downloaded_bytes = d.get('downloaded_bytes')
-
-        if total_bytes and downloaded_bytes is not None:
-            percent = downloaded_bytes / total_bytes * 100
-            speed = d.get('speed')
-            speed_str = f"{speed / 1024 / 1024:.2f} MiB/s" if speed else "N/A"
-            eta = d.get('eta')
-            eta_str = f"{int(eta)}s" if eta else "N/A"
-
-            sys.stdout.write(
-                f"\r -> 进度: {percent:.1f}% | "
-                f"大小: {downloaded_bytes / 1024 / 1024:.2f}/{total_bytes / 1024 / 1024:.2f} MiB | "
-                f"速度: {speed_str} | "
-                f"ETA: {eta_str}"
-            )
-            sys.stdout.flush()
-
-    elif d['status'] == 'finished':
-        # 当下载完成后，yt-dlp会自动处理合并等后期工作
-        if d.get('postprocessor') == 'Merger':
-            print(f"\n音视频下载完成，正在合并...")
-        elif d.get('postprocessor') == 'EmbedSubtitle':
-            print(f"\n音视频已合并，正在内嵌字幕...")
+    items = sorted(results['items'], key=lambda item: item['index'])
+    summary = {'elapsed': time.perf_counter() - start, 'bytes': sum(item['bytes'] for item in items),
+               'phases': progress.totals()['phases'], 'items': items}
+    counts = {status: sum(1 for item in items if item['status'] == status)
+              for status in ('ok', 'skipped', 'error')}
+    print(f"\n批量下载完成！成功 {counts['ok']} 个，跳过 {counts['skipped']} 个，失败 {counts['error']} 个，"
+          f"共 {summary['bytes'] / 1024 / 1024:.2f} MiB，用时 {summary['elapsed']:.1f} 秒")
+    if summary['phases']:
+        print(f"各阶段累计用时: {format_phases(summary['phases'])}")
+
+    if summary_file:
+        summary_path = os.path.join(output_path, summary_file)
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"汇总已写入: {summary_path}")
+    return summary
+
+
+PHASE_NAMES = {'download': '下载', 'Merger': '合并', 'EmbedSubtitle': '内嵌字幕', 'SingleMux': '一次合并',
+               'SubtitlesConvertor': '转换字幕', 'MoveFiles': '移动文件'}
+
+
+def format_phases(phases):
+    """把 {'download': 3.2, 'Merger': 0.4} 格式化为 '下载 3.2s, 合并 0.4s'"""
+    return ', '.join(f"{PHASE_NAMES.get(name, name)} {seconds:.1f}s" for name, seconds in phases.items())
+
+
+class ProgressAggregator:
+    """
+    汇总所有下载（包括批量下载的所有线程）的进度，按固定的刷新间隔输出一行状态，
+    而不是在 yt-dlp 的每次回调（分片视频每秒可能上千次）中都写一次终端。
+
+    同时记录每个视频各阶段的耗时：下载、合并 (Merger)、内嵌字幕 (EmbedSubtitle) 等后处理，
+    并可把开始/结束事件和定时的进度快照写入 JSON lines 文件，便于分析时间花在了哪里。
+    """
+
+    def __init__(self, refresh_interval=0.5, events_file=None, stream=None):
+        """
+        :param refresh_interval: 终端状态行的刷新间隔（秒）；输出不是终端时最多每 10 秒输出一行
+        :param events_file: 可选的 JSON lines 事件文件路径（追加写入）
+        :param stream: 状态行的输出流，默认为 sys.stdout
+        """
+        self.stream = stream or sys.stdout
+        self.tty = self.stream.isatty()
+        self.interval = refresh_interval if self.tty else max(refresh_interval, 10.0)
+        self.events = open(events_file, 'a', encoding='utf-8') if events_file else None
+        self.lock = threading.Lock()
+        self.start = time.monotonic()
+        self.last_render = self.start
+        self.line_shown = False
+        self.active = {}  # 文件名 -> 下载状态
+        self.finished_bytes = 0
+        self.video_phases = {}  # 视频 id -> {阶段: 秒数}
+        self.pp_started = {}  # (视频 id, 后处理名称) -> 开始时间
+
+    def _event(self, event, **fields):
+        """写一条 JSON lines 事件（调用方需持有锁）"""
+        if self.events is not None:
+            record = {'t': round(time.monotonic() - self.start, 3), 'event': event, **fields}
+            self.events.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def _add_phase(self, video_id, phase, seconds):
+        phases = self.video_phases.setdefault(video_id, {})
+        phases[phase] = phases.get(phase, 0.0) + seconds
+
+    def hook(self, d):
+        """
+        yt-dlp 进度回调：只更新内存中的状态，到了刷新时间才输出。
+        只统计本次实际传输的字节数：和 BandwidthLimiter 一样，第一次回调时的字节数可能来自续传的 .part 文件，
+        作为起点不计入；没有经过下载就直接结束的文件（之前已经下载完成）计为 0
+        :return: 下载结束（finished/error）时返回该文件本次传输的字节数，否则返回 None
+        """
+        now = time.monotonic()
+        video_id = (d.get('info_dict') or {}).get('id')
+        key = d.get('filename')
+        downloaded = d.get('downloaded_bytes')
+        with self.lock:
+            state = self.active.get(key)
+            if state is None:
+                state = self.active[key] = {'id': video_id, 'start': now, 'base': None, 'downloaded': 0,
+                                            'total': None, 'speed': None}
+                self._event('download_started', id=video_id, file=d.get('filename'))
+            if d['status'] == 'downloading' and state['base'] is None:
+                state['base'] = downloaded or 0
+            state['downloaded'] = downloaded or state['downloaded']
+            state['total'] = d.get('total_bytes') or d.get('total_bytes_estimate') or state['total']
+            state['speed'] = d.get('speed')
+            transferred = None
+            if d['status'] in ('finished', 'error'):
+                del self.active[key]
+                elapsed = now - state['start']
+                transferred = self._transferred(state)
+                if d['status'] == 'finished':
+                    self.finished_bytes += transferred
+                    self._add_phase(video_id, 'download', elapsed)
+                self._event(f"download_{d['status']}", id=video_id, file=d.get('filename'), bytes=transferred,
+                            elapsed=round(elapsed, 3))
+            if now - self.last_render >= self.interval:
+                self.last_render = now
+                self._render()
+        return transferred
+
+    @staticmethod
+    def _transferred(state):
+        """一个文件本次传输的字节数"""
+        if state['base'] is None:
+            return 0
+        return max(0, state['downloaded'] - state['base'])
+
+    def postprocessor_hook(self, d):
+        """yt-dlp 后处理回调：记录合并、内嵌字幕等步骤的耗时"""
+        now = time.monotonic()
+        video_id = (d.get('info_dict') or {}).get('id')
+        name = d.get('postprocessor')
+        with self.lock:
+            if d['status'] == 'started':
+                self.pp_started[(video_id, name)] = now
+                self._event('postprocess_started', id=video_id, postprocessor=name)
+            elif d['status'] == 'finished':
+                elapsed = now - self.pp_started.pop((video_id, name), now)
+                self._add_phase(video_id, name, elapsed)
+                self._event('postprocess_finished', id=video_id, postprocessor=name, elapsed=round(elapsed, 3))
+
+    def _snapshot(self):
+        """当前的汇总进度（调用方需持有锁）"""
+        downloaded = self.finished_bytes + sum(self._transferred(state) for state in self.active.values())
+        speed = sum(state['speed'] or 0 for state in self.active.values())
+        remaining = sum(state['total'] - state['downloaded'] for state in self.active.values()
+                        if state['total'] and state['total'] > state['downloaded'])
+        eta = remaining / speed if speed else None
+        return {'active': len(self.active), 'bytes': downloaded, 'speed': round(speed), 'eta': eta and round(eta, 1)}
+
+    def _render(self):
+        """输出一行汇总状态，并记录一条进度快照（调用方需持有锁）"""
+        snap = self._snapshot()
+        self._event('progress', **snap)
+        if self.events is not None:
+            self.events.flush()
+        eta_str = f"{int(snap['eta'])}s" if snap['eta'] is not None else "N/A"
+        line = (f" -> 下载中: {snap['active']} 个 | 已下载: {snap['bytes'] / 1024 / 1024:.2f} MiB | "
+                f"速度: {snap['speed'] / 1024 / 1024:.2f} MiB/s | ETA: {eta_str}")
+        if self.tty:
+            self.stream.write('\r' + line.ljust(80))
+            self.line_shown = True
         else:
-            print(f"\n文件 {d['filename']} 处理完成。")
+            self.stream.write(line + '\n')
+        self.stream.flush()
+
+    def message(self, text):
+        """输出一行消息，不会和状态行混在一起"""
+        with self.lock:
+            if self.line_shown:
+                self.stream.write('\r' + ' ' * 80 + '\r')
+                self.line_shown = False
+            self.stream.write(text + '\n')
+            self.stream.flush()
+
+    def phases(self, video_id):
+        """某个视频各阶段的耗时 {阶段: 秒数}"""
+        with self.lock:
+            return {name: round(seconds, 3) for name, seconds in self.video_phases.get(video_id, {}).items()}
+
+    def _totals(self):
+        phases = {}
+        for video_phases in self.video_phases.values():
+            for name, seconds in video_phases.items():
+                phases[name] = round(phases.get(name, 0.0) + seconds, 3)
+        return {'bytes': self.finished_bytes, 'phases': phases}
+
+    def totals(self):
+        """所有视频的汇总：{'bytes': 总字节数, 'phases': {阶段: 累计秒数}}"""
+        with self.lock:
+            return self._totals()
+
+    def close(self):
+        """结束状态行，写入汇总事件并关闭事件文件"""
+        with self.lock:
+            if self.line_shown:
+                self.stream.write('\n')
+                self.line_shown = False
+            if self.events is not None:
+                self._event('summary', **self._totals())
+                self.events.close()
+                self.events = None
+
+
+def parse_arguments(argv=None):
+    """解析命令行参数，不带参数时下载下面的示例视频
+    :param argv: 参数列表，默认使用 sys.argv[1:]
+    """
+    parser = argparse.ArgumentParser(description='下载B站视频，支持批量、合集和收藏夹')
+    parser.add_argument('urls', nargs='*', help='视频、合集或收藏夹的URL')
+    parser.add_argument('-a', '--batch-file', help='URL列表文件，每行一个URL，# 开头的行为注释')
+    parser.add_argument('-o', '--output', default='./', help='保存路径 (默认: 当前文件夹)')
+    parser.add_argument('-j', '--workers', type=int, default=3, help='同时下载的视频数 (默认: 3)')
+    parser.add_argument('-p', '--profile', choices=list(PROFILES), default='balanced',
+                        help='下载性能预设：fast 多连接、balanced（默认）、polite 单连接并限速 2 MiB/s')
+    parser.add_argument('-r', '--limit-rate', type=parse_rate, default=None, metavar='RATE',
+                        help='总带宽上限，批量下载时所有线程共用，例如 500K、2M')
+    parser.add_argument('--subtitle-mode', choices=SUBTITLE_MODES, default='embed',
+                        help='字幕处理方式：embed 合并后再内嵌（默认）、mux 音视频和字幕一次合并、sidecar 只保存 .srt 文件')
+    parser.add_argument('--no-subtitle', action='store_true', help='不下载字幕')
+    parser.add_argument('--archive', default='download_archive.txt',
+                        help='下载记录文件，已下载的视频会被跳过 (默认: 保存路径下的 download_archive.txt)')
+    parser.add_argument('--no-archive', action='store_true', help='不使用下载记录')
+    parser.add_argument('--events', metavar='FILE',
+                        help='把各阶段（下载/合并/内嵌字幕）的事件和进度快照以 JSON lines 格式追加到 FILE')
+    parser.add_argument('--summary', default='download_summary.json',
+                        help='JSON 汇总文件 (默认: 保存路径下的 download_summary.json)')
+    return parser.parse_args(argv)
 
 
 # --- 使用示例 ---
 if __name__ == "__main__":
-    # 请将下面的URL替换为你想下载的B站视频URL
+    # 不带参数运行时下载这个示例视频；批量下载请在命令行中传入URL或URL列表文件
     target_video_url = "https://www.bilibili.com/video/BV1Y3TTzCETb/?spm_id_from=333.1007.tianma.6-4-22.click"  # 示例URL
 
-    # 指定保存视频的文件夹，'.' 表示当前文件夹
-    save_path = './'
+    args = parse_arguments()
+    urls = list(args.urls)
+    if args.batch_file:
+        urls += read_url_file(args.batch_file)
 
-   # 确保视频本身有提供字幕，否则此功能无效
-    print("\n" + "="*50)
-    print("--- 开始下载任务（尝试内嵌字幕）---")
-    # 你可以修改这里的 download_subtitle=False 来关闭字幕下载
-    download_bilibili_video(target_video_url, save_path, download_subtitle=True)
-    print("="*50)
+    if urls:
+        batch_download(urls, args.output, download_subtitle=not args.no_subtitle, workers=args.workers,
+                       archive_file=None if args.no_archive else args.archive, summary_file=args.summary,
+                       profile=args.profile, rate_limit=args.limit_rate, events_file=args.events,
+                       subtitle_mode=args.subtitle_mode)
+    else:
+        # 确保视频本身有提供字幕，否则此功能无效
+        print("\n" + "="*50)
+        print("--- 开始下载任务（尝试内嵌字幕）---")
+        # 你可以加上 --no-subtitle 来关闭字幕下载
+        download_bilibili_video(target_video_url, args.output, download_subtitle=not args.no_subtitle,
+                                profile=args.profile, rate_limit=args.limit_rate, events_file=args.events,
+                                subtitle_mode=args.subtitle_mode)
+        print("="*50)
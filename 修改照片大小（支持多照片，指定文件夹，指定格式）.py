@@ -1,81 +1,572 @@
-# 需要安装pillow库
-from PIL import Image
+# 需要安装pillow库（在处理图片的函数中才导入，--help 和空文件夹不必等待载入 Pillow）
+import io
 import os
-import glob
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import FIRST_COMPLETED, wait
 
+from file_scanner import IMAGE_EXTENSIONS, scan_files
 
-def batch_resize_images(input_folder, output_folder, max_width, max_height, output_format='jpg'):
+# 速度/质量预设: (重采样滤镜名，即 Image.Resampling 的成员名, reducing_gap)
+# reducing_gap 越小，解码和预缩小阶段丢弃的像素越多，速度越快；None 表示完整解码后一次性重采样
+PRESETS = {
+    'fast': ('BILINEAR', 1.0),
+    'balanced': ('BICUBIC', 2.0),
+    'quality': ('LANCZOS', 3.0),
+    'best': ('LANCZOS', None),
+}
+
+
+def draft_for_size(img, max_width, max_height, reducing_gap):
     """
-    批量调整文件夹中所有图片的尺寸，保持原始宽高比，并可指定输出格式。
-    图片会被等比缩放，以适应 (max_width, max_height) 的边界框。
+    在解码之前让 JPEG 解码器直接按 1/2、1/4、1/8 的 DCT 缩放解码，避免先解出全尺寸位图。
+    按等比缩放后的最终尺寸（而不是边界框）计算缩放比例，宽高比与边界框不一致的图片能缩得更多。
+    其他格式不受影响（之后的 thumbnail 会用 reduce() 做整数倍预缩小）。
 
-    :param input_folder: 包含原始图片的文件夹路径。
+    :param img: 刚打开、尚未解码的图片。
+    :param max_width: 目标宽度的最大值。
+    :param max_height: 目标高度的最大值。
+    :param reducing_gap: 解码尺寸至少保留为最终尺寸的多少倍，None 表示不缩放解码。
+    """
+    if reducing_gap is None:
+        return
+    scale = min(max_width / img.width, max_height / img.height)
+    if scale >= 1:
+        return
+    img.draft(None, (max(1, int(img.width * scale * reducing_gap)), max(1, int(img.height * scale * reducing_gap))))
+
+
+def prepare_for_format(img, output_format, file_name):
+    """
+    按输出格式做必要的转换。
+    :return: (可直接保存的图片, 提示信息或 None)
+    """
+    from PIL import Image
+
+    # --- 透明通道处理，现在更加健壮 ---
+    # 如果原图有透明度('P'模式的透明或'RGBA')且要保存为JPG，则转换为RGB
+    if output_format.lower() in ['jpg', 'jpeg']:
+        if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+            # 使用一个白色背景进行填充
+            img_rgb = Image.new("RGB", img.size, (255, 255, 255))
+            img_rgb.paste(img, (0, 0), img.getchannel('A') if img.mode == 'RGBA' else None)
+            return img_rgb, f"{file_name} 包含透明通道, 已转换为RGB格式进行保存"
+    return img, None
+
+
+def save_image(img, output_path, **save_options):
+    """
+    先写入同一文件夹中的临时文件再替换为最终文件，中途中断或出错不会留下写了一半的图片。
+    临时文件名保留扩展名，Pillow 据此判断输出格式。
+    """
+    directory, name = os.path.split(output_path)
+    stem, ext = os.path.splitext(name)
+    tmp_path = os.path.join(directory, f".{stem}.tmp{os.getpid()}{ext}")
+    try:
+        img.save(tmp_path, **save_options)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def resize_image(file_path, output_folder, max_width, max_height, output_format='jpg', preset='balanced',
+                 quality=None, source=None):
+    """
+    调整单张图片的尺寸并保存。只依赖参数，可以放到进程池中执行。
+
+    :param file_path: 原始图片路径。
     :param output_folder: 保存调整后图片的文件夹路径。
     :param max_width: 目标宽度的最大值。
     :param max_height: 目标高度的最大值。
-    :param output_format: 目标输出格式的后缀名 (例如 'png', 'jpeg')。
+    :param output_format: 目标输出格式的后缀名。
+    :param preset: 速度/质量预设，见 PRESETS。
+    :param quality: 编码质量 (JPEG/WebP 为 1-95)，None 表示使用 Pillow 的默认值。
+    :param source: 可选的已读入内存的原图（见 read_source），为 None 时从 file_path 读取。
+    :return: (新文件名, 调整后的尺寸, 提示信息或 None)
     """
+    from PIL import Image
+
+    file_name = os.path.basename(file_path)
+    resample, reducing_gap = PRESETS[preset]
+    resample = getattr(Image.Resampling, resample)
+    with open_image(file_path, source) as img:
+        # --- 快速路径：以缩小的分辨率解码 ---
+        draft_for_size(img, max_width, max_height, reducing_gap)
+
+        # --- 核心改进：保持宽高比进行缩放 ---
+        img.thumbnail((max_width, max_height), resample=resample, reducing_gap=reducing_gap)
+
+        # --- 文件名和路径处理 ---
+        file_name_without_ext = os.path.splitext(file_name)[0]
+        new_file_name = f"{file_name_without_ext}.{output_format.lower()}"
+        output_path = os.path.join(output_folder, new_file_name)
+
+        img_resized, note = prepare_for_format(img, output_format, file_name)
+
+        # 保存为指定格式
+        save_options = {'quality': quality} if quality is not None else {}
+        save_image(img_resized, output_path, **save_options)
+        return new_file_name, img_resized.size, note
+
+
+def rendition_folder(rendition):
+    """每种规格的输出子文件夹名，例如 '1920x1080_webp_q80'"""
+    max_width, max_height, output_format, quality = rendition
+    name = f"{max_width}x{max_height}_{output_format.lower()}"
+    return f"{name}_q{quality}" if quality is not None else name
+
+
+def render_image(file_path, output_folder, renditions, preset='balanced', sub_folder='', source=None):
+    """
+    只解码一次原图，输出多种尺寸和格式。只依赖参数，可以放到进程池中执行。
+    按目标尺寸从大到小逐级缩小：每一级都从上一级的结果缩小，而不是从原图重新缩小；
+    尺寸相同、格式不同的规格共用同一次缩放结果。'best' 预设下每一级都从原图缩小。
+
+    :param file_path: 原始图片路径。
+    :param output_folder: 输出根文件夹，每种规格保存在各自的子文件夹中（见 rendition_folder）。
+    :param renditions: 规格列表，每项为 (max_width, max_height, output_format, quality)。
+    :param preset: 速度/质量预设，见 PRESETS。
+    :param sub_folder: 规格子文件夹下的相对目录，用于还原输入文件夹的目录结构。
+    :param source: 可选的已读入内存的原图（见 read_source），为 None 时从 file_path 读取。
+    :return: ([(相对输出路径, 尺寸)], [提示信息])
+    """
+    from PIL import Image
+
+    file_name = os.path.basename(file_path)
+    file_name_without_ext = os.path.splitext(file_name)[0]
+    resample, reducing_gap = PRESETS[preset]
+    resample = getattr(Image.Resampling, resample)
+    outputs = []
+    notes = []
+    with open_image(file_path, source) as img:
+        # 按最大的规格缩放解码，所有规格共用这一次解码
+        boxes = sorted({(w, h) for w, h, _, _ in renditions},
+                       key=lambda box: min(box[0] / img.width, box[1] / img.height), reverse=True)
+        draft_for_size(img, boxes[0][0], boxes[0][1], reducing_gap)
+        img.load()
+
+        resized = {}
+        current = img
+        for box in boxes:
+            source = img if reducing_gap is None else current
+            current = source.copy()
+            current.thumbnail(box, resample=resample, reducing_gap=reducing_gap)
+            resized[box] = current
+
+        for rendition in renditions:
+            max_width, max_height, output_format, quality = rendition
+            img_out, note = prepare_for_format(resized[(max_width, max_height)], output_format, file_name)
+            if note and note not in notes:
+                notes.append(note)
+            rel_path = os.path.join(rendition_folder(rendition), sub_folder,
+                                    f"{file_name_without_ext}.{output_format.lower()}")
+            os.makedirs(os.path.dirname(os.path.join(output_folder, rel_path)), exist_ok=True)
+            save_options = {'quality': quality} if quality is not None else {}
+            save_image(img_out, os.path.join(output_folder, rel_path), **save_options)
+            outputs.append((rel_path, img_out.size))
+    return outputs, notes
+
+
+MANIFEST_NAME = '.resize_manifest.json'  # 增量处理清单，保存在输出文件夹中
+MANIFEST_VERSION = 1
+# 处理过程中每完成一张图片就向日志追加一行，中途中断也不会丢失进度；结束时合并进清单并删除日志。
+# 追加的开销与清单大小无关，不必在处理过程中反复重写整个清单
+JOURNAL_NAME = '.resize_manifest.journal'
+
+
+def file_digest(file_path):
+    """计算文件内容的哈希值"""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def read_source(file_path):
+    """
+    把原图整个读入内存，解码和计算内容哈希共用这一份数据，不必为了哈希再读一遍文件
+    :return: (可交给 Image.open 的内存文件, 与 file_digest() 相同的内容哈希)
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return io.BytesIO(data), hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def open_image(file_path, source=None):
+    """
+    打开原图：source 为 read_source() 读入的内存文件，None 时从 file_path 读取。
+    无法识别内存中的图片时，错误信息改用文件路径，失败列表中仍能看出是哪张图片。
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    if source is None:
+        return Image.open(file_path)
+    try:
+        return Image.open(source)
+    except UnidentifiedImageError:
+        raise UnidentifiedImageError(f"cannot identify image file {file_path!r}") from None
+
+
+def load_manifest(output_folder):
+    """读取输出文件夹中的处理清单并重放上次未合并的日志，不存在或已损坏时返回空清单"""
+    entries = {}
+    try:
+        with open(os.path.join(output_folder, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            entries = manifest['files']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+    try:
+        with open(os.path.join(output_folder, JOURNAL_NAME), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    entries[record['key']] = record['entry']
+                except (ValueError, KeyError, TypeError):
+                    break  # 中断时写了一半的最后一行
+    except OSError:
+        pass
+    return entries
+
+
+def open_journal(output_folder):
+    """以追加方式打开日志（行缓冲，每条记录写完即落盘）"""
+    return open(os.path.join(output_folder, JOURNAL_NAME), 'a', encoding='utf-8', buffering=1)
+
+
+def save_manifest(output_folder, entries):
+    """原子地写入处理清单（先写临时文件再替换），然后删除已合并的日志"""
+    path = os.path.join(output_folder, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'files': entries}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    journal_path = os.path.join(output_folder, JOURNAL_NAME)
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+
+
+def entry_outputs(entry):
+    """清单条目对应的全部输出文件（单一尺寸模式为一个，多规格模式为多个）"""
+    output = entry['output']
+    return output if isinstance(output, list) else [output]
+
+
+def is_up_to_date(entry, file_path, st, params, output_folder):
+    """
+    判断某个输入文件的输出是否仍然有效：参数相同、输出存在，且输入未变化。
+    大小或修改时间变了时再比较内容哈希，只被 touch 过的文件不会重新处理（会就地更新清单中的时间戳）。
+    """
+    if not entry or entry.get('params') != params:
+        return False
+    if not all(os.path.exists(os.path.join(output_folder, output)) for output in entry_outputs(entry)):
+        return False
+    if entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+        return True
+    if entry['size'] == st.st_size and entry.get('hash') == file_digest(file_path):
+        entry['mtime_ns'] = st.st_mtime_ns
+        return True
+    return False
+
+
+def _resize_task(file_path, rel_dir, output_folder, *args):
+    """单一尺寸模式的任务：返回 (输出文件列表, 结果描述, 提示信息列表, 输入哈希)"""
+    target_folder = os.path.join(output_folder, rel_dir)
+    os.makedirs(target_folder, exist_ok=True)
+    source, digest = read_source(file_path)
+    new_file_name, size, note = resize_image(file_path, target_folder, *args, source=source)
+    output = os.path.join(rel_dir, new_file_name)
+    return [output], f"{output} (尺寸: {size})", [note] if note else [], digest
+
+
+def _render_task(file_path, rel_dir, *args):
+    """多规格模式的任务：返回 (输出文件列表, 结果描述, 提示信息列表, 输入哈希)"""
+    source, digest = read_source(file_path)
+    outputs, notes = render_image(file_path, *args, sub_folder=rel_dir, source=source)
+    description = ', '.join(f"{rel_path} {size}" for rel_path, size in outputs)
+    return [rel_path for rel_path, _ in outputs], description, notes, digest
+
+
+def _call_safe(func, args):
+    """在工作进程中调用 func，把异常转换为返回值，使单个文件出错不影响其他文件"""
+    try:
+        return func(*args), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def run_ordered(func, arg_list, workers=1, max_in_flight=None):
+    """
+    用进程池并发执行 func，并按输入顺序逐个产出结果。
+    同时提交的任务数有上限，避免结果堆积占用过多内存。
+
+    :param func: 要执行的函数（必须可以被 pickle，即模块级函数）。
+    :param arg_list: 每个任务的参数元组组成的可迭代对象。
+    :param workers: 工作进程数，为 1 时直接在当前进程中串行执行。
+    :param max_in_flight: 同时提交的最大任务数，默认为 workers 的 2 倍。
+    :return: (参数元组, 结果, 错误信息) 生成器，成功时错误信息为 None。
+    """
+    if workers <= 1:
+        for args in arg_list:
+            yield (args, *_call_safe(func, args))
+        return
+
+    from concurrent.futures import ProcessPoolExecutor  # 载入 multiprocessing 较慢，只在并行时导入
+
+    max_in_flight = max_in_flight or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = {}  # 序号 -> (参数, future)
+        next_submit = 0
+        next_yield = 0
+        arg_iter = iter(arg_list)
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_in_flight:
+                try:
+                    args = next(arg_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[next_submit] = (args, executor.submit(_call_safe, func, args))
+                next_submit += 1
+            if not pending:
+                break
+
+            # 只有最早提交的任务完成后才能按顺序产出；等待期间其他任务继续执行
+            args, future = pending[next_yield]
+            if not future.done():
+                wait([f for _, f in pending.values()], return_when=FIRST_COMPLETED)
+                continue
+            del pending[next_yield]
+            next_yield += 1
+            yield (args, *future.result())
+
+
+def _run_batch(input_folder, output_folder, task, task_args, params, workers, incremental, recursive=False,
+               include=None, exclude=None):
+    """
+    批处理的公共流程：边扫描边处理图片，对照处理清单跳过已是最新的图片，
+    用进程池按顺序处理其余图片并更新清单，扫描结束后删除输入已不存在的旧输出。
+
+    :param task: 处理单张图片的模块级函数，参数为 (文件路径, 相对目录, *task_args)，
+                 返回 (输出文件列表, 结果描述, 提示信息列表, 输入哈希)。
+    :param task_args: 传给 task 的其余参数。
+    :param params: 记录到清单中的处理参数，参数变化的图片会被重新处理。
+    :param recursive: 是否递归处理子文件夹，输出文件夹中会还原相同的目录结构。
+    :param include: 只处理匹配这些通配符的图片。
+    :param exclude: 跳过匹配这些通配符的图片或文件夹。
+    """
+    summary = {'processed': 0, 'skipped': 0, 'removed': 0, 'failed': [], 'elapsed': 0.0}
+    if not os.path.isdir(input_folder):
+        # 在创建输出文件夹和清单之前检查
+        print(f"在文件夹 '{input_folder}' 中未找到支持的图片文件。")
+        return summary
+
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
         print(f"已创建输出文件夹: {output_folder}")
 
-    supported_formats = ["*.jpg", "*.jpeg", "*.png", "*.bmp", "*.gif"]
-    image_files = []
-    for fmt in supported_formats:
-        image_files.extend(glob.glob(os.path.join(input_folder, fmt)))
+    manifest = load_manifest(output_folder) if incremental else {}
+    seen_keys = set()
+    scan_errors = []  # 无法读取的子文件夹
+    # 输出文件名只取决于相对路径去掉扩展名的部分，a.jpg 和 a.png（或 a.JPG）会写到同一个输出，
+    # 按扫描顺序先到的图片占用该输出，其余的记为失败
+    claimed = {}  # 去掉扩展名的相对路径 -> 清单键
+    info = {}  # 文件路径 -> (清单键, stat)
 
-    if not image_files:
-        print(f"在文件夹 '{input_folder}' 中未找到支持的图片文件。")
-        return
+    def pending_tasks():
+        """边扫描边产出需要处理的任务，已是最新的图片直接跳过"""
+        found = scan_files(input_folder, IMAGE_EXTENSIONS, recursive=recursive, include=include,
+                           exclude=exclude, skip_dirs=[output_folder], errors=scan_errors)
+        for file_path, key, entry in found:
+            seen_keys.add(key)
+            stem = os.path.normcase(os.path.splitext(key)[0])
+            if stem in claimed:
+                error = f"输出文件与 '{claimed[stem]}' 相同，已跳过"
+                summary['failed'].append((key, error))
+                print(f"处理文件 {key} 时出错: {error}")
+                manifest.pop(key, None)  # 否则清理过期输出时会删掉另一张图片的输出
+                continue
+            claimed[stem] = key
+            st = entry.stat()
+            if incremental and is_up_to_date(manifest.get(key), file_path, st, params, output_folder):
+                summary['skipped'] += 1
+                continue
+            info[file_path] = (key, st)
+            yield (file_path, os.path.dirname(key), *task_args)
 
-    print(f"找到 {len(image_files)} 张图片，开始处理...")
+    print(f"正在扫描 '{input_folder}'{'（包括子文件夹）' if recursive else ''}，使用 {workers} 个进程处理...")
 
-    for index, file_path in enumerate(image_files):
-        file_name = os.path.basename(file_path)
-        try:
-            with Image.open(file_path) as img:
-                # --- 核心改进：保持宽高比进行缩放 ---
-                img.thumbnail((max_width, max_height))
-                img_resized = img
+    start = time.perf_counter()
+    journal = open_journal(output_folder)
+    try:
+        for args, result, error in run_ordered(task, pending_tasks(), workers):
+            key, st = info.pop(args[0])
+            if error is not None:
+                summary['failed'].append((key, error))
+                print(f"处理文件 {key} 时出错: {error}")
+                continue
 
-                # --- 文件名和路径处理 ---
-                file_name_without_ext = os.path.splitext(file_name)[0]
-                new_file_name = f"{file_name_without_ext}.{output_format.lower()}"
-                output_path = os.path.join(output_folder, new_file_name)
+            outputs, description, notes, digest = result
+            old_entry = manifest.get(key)
+            if old_entry:
+                # 参数变了（例如输出格式），旧的输出文件已经没用了
+                for output in set(entry_outputs(old_entry)) - set(outputs):
+                    old_output = os.path.join(output_folder, output)
+                    if os.path.exists(old_output):
+                        os.remove(old_output)
+            manifest[key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'hash': digest,
+                             'params': params, 'output': outputs if len(outputs) > 1 else outputs[0]}
+            journal.write(json.dumps({'key': key, 'entry': manifest[key]}, ensure_ascii=False) + '\n')
 
-                # --- 透明通道处理，现在更加健壮 ---
-                # 如果原图有透明度('P'模式的透明或'RGBA')且要保存为JPG，则转换为RGB
-                if output_format.lower() in ['jpg', 'jpeg']:
-                    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
-                        print(f"  (提示: {file_name} 包含透明通道, 已转换为RGB格式进行保存)")
-                        # 使用一个白色背景进行填充
-                        img_resized = Image.new("RGB", img.size, (255, 255, 255))
-                        img_resized.paste(img, (0, 0), img.getchannel('A') if img.mode == 'RGBA' else None)
+            for note in notes:
+                print(f"  (提示: {note})")
+            summary['processed'] += 1
+            print(f"({summary['processed']}) 已处理: {key} -> {description}")
 
-                # 保存为指定格式
-                img_resized.save(output_path)
-                print(
-                    f"({index + 1}/{len(image_files)}) 已处理: {file_name} -> {new_file_name} (尺寸: {img_resized.size})")
+        # --- 扫描完成后，删除输入已不存在的旧输出 ---
+        # 没扫描到的图片也可能只是被 --include/--exclude 过滤掉、不在本次（非递归）扫描范围内，
+        # 或所在的子文件夹读取失败，因此只在扫描完整时清理，并且只清理输入文件确实已不存在的条目
+        filtered = include or exclude or scan_errors
+        stale = [] if filtered else [key for key in manifest if key not in seen_keys
+                                     and not os.path.exists(os.path.join(input_folder, key))]
+        stale_entries = [manifest.pop(key) for key in stale]
+        # 旧版本的清单中可能有两张图片记录了同一个输出，仍被其他图片使用的输出不能删除
+        live = {output for entry in manifest.values() for output in entry_outputs(entry)}
+        for entry in stale_entries:
+            for output in entry_outputs(entry):
+                output_path = os.path.join(output_folder, output)
+                if output not in live and os.path.exists(output_path):
+                    os.remove(output_path)
+                    summary['removed'] += 1
+                    print(f"已删除过期输出: {output}")
+    finally:
+        journal.close()
+        save_manifest(output_folder, manifest)
+    summary['elapsed'] = time.perf_counter() - start
 
-        except Exception as e:
-            print(f"处理文件 {file_name} 时出错: {e}")
+    if not seen_keys:
+        print(f"在文件夹 '{input_folder}' 中未找到支持的图片文件。")
+        return summary
 
-    print("\n所有图片处理完成！")
+    rate = summary['processed'] / summary['elapsed'] if summary['elapsed'] else 0.0
+    print(f"\n所有图片处理完成！共 {len(seen_keys)} 张，成功 {summary['processed']} 张，跳过 {summary['skipped']} 张，"
+          f"失败 {len(summary['failed'])} 张，用时 {summary['elapsed']:.2f} 秒 ({rate:.1f} 张/秒)")
+    for file_name, error in summary['failed']:
+        print(f"  失败: {file_name} - {error}")
+    return summary
 
 
-# --- 使用示例 ---
-if __name__ == "__main__":
+def batch_resize_images(input_folder, output_folder, max_width, max_height, output_format='jpg', workers=1,
+                        preset='balanced', quality=None, incremental=True, recursive=False, include=None,
+                        exclude=None):
+    """
+    批量调整文件夹中所有图片的尺寸，保持原始宽高比，并可指定输出格式。
+    图片会被等比缩放，以适应 (max_width, max_height) 的边界框。
+    输出文件夹中会保存一份处理清单，再次运行时跳过已是最新的图片，只处理新增或变化的图片，
+    并删除输入已不存在的旧输出。
+
+    :param input_folder: 包含原始图片的文件夹路径。
+    :param output_folder: 保存调整后图片的文件夹路径。
+    :param max_width: 目标宽度的最大值。
+    :param max_height: 目标高度的最大值。
+    :param output_format: 目标输出格式的后缀名 (例如 'png', 'jpeg')。
+    :param workers: 并行处理的进程数，为 1 时串行处理。
+    :param preset: 速度/质量预设: 'fast', 'balanced', 'quality' 或 'best'。
+    :param quality: 编码质量 (JPEG/WebP 为 1-95)，None 表示使用 Pillow 的默认值。
+    :param incremental: 为 False 时忽略处理清单，重新处理所有图片。
+    :param recursive: 是否递归处理子文件夹，输出文件夹中会还原相同的目录结构。
+    :param include: 可选的通配符列表，只处理匹配的图片（匹配相对路径或文件名），例如 ['*.png']。
+    :param exclude: 可选的通配符列表，跳过匹配的图片或子文件夹。
+    :return: 统计信息字典 {'processed': 成功数, 'skipped': 跳过数, 'removed': 删除的旧输出数,
+             'failed': [(文件名, 错误信息)], 'elapsed': 耗时秒数}
     """
-    提示：脚本会将图片等比例缩放，确保其宽度不超过 target_max_width，高度不超过 target_max_height。
+    params = {'max_width': max_width, 'max_height': max_height, 'output_format': output_format.lower(),
+              'preset': preset, 'quality': quality}
+    return _run_batch(input_folder, output_folder, _resize_task,
+                      (output_folder, max_width, max_height, output_format, preset, quality),
+                      params, workers, incremental, recursive, include, exclude)
+
+
+def batch_render_images(input_folder, output_folder, renditions, workers=1, preset='balanced', incremental=True,
+                        recursive=False, include=None, exclude=None):
     """
-    input_directory = 'input_images'
-    output_directory = 'output_images_resized'
+    多规格模式：每张原图只解码一次，输出多种尺寸和格式（例如缩略图、预览图、网页图，各有 PNG 和 WebP）。
+    每种规格保存在输出文件夹下各自的子文件夹中，例如 '320x240_webp_q80/'。
+
+    :param input_folder: 包含原始图片的文件夹路径。
+    :param output_folder: 输出根文件夹路径。
+    :param renditions: 规格列表，每项为 (max_width, max_height, output_format, quality)，quality 可为 None。
+    :param workers: 并行处理的进程数，为 1 时串行处理。
+    :param preset: 速度/质量预设: 'fast', 'balanced', 'quality' 或 'best'。
+    :param incremental: 为 False 时忽略处理清单，重新处理所有图片。
+    :param recursive, include, exclude: 同 batch_resize_images()。
+    :return: 统计信息字典，同 batch_resize_images()
+    """
+    renditions = [(int(w), int(h), fmt.lower(), None if q is None else int(q)) for w, h, fmt, q in renditions]
+    params = {'renditions': [list(rendition) for rendition in renditions], 'preset': preset}
+    return _run_batch(input_folder, output_folder, _render_task, (output_folder, renditions, preset),
+                      params, workers, incremental, recursive, include, exclude)
+
 
-    # 设置目标尺寸的最大边界
-    target_max_width = 800
-    target_max_height = 600
+def parse_rendition(text):
+    """解析命令行中的规格，格式为 宽x高:格式[:质量]，例如 320x240:webp:80"""
+    parts = text.split(':')
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError(f"规格格式应为 宽x高:格式[:质量]，例如 320x240:webp:80，而不是 {text}")
+    try:
+        width, height = (int(v) for v in parts[0].lower().split('x'))
+        quality = int(parts[2]) if len(parts) == 3 else None
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无法解析规格: {text}")
+    return width, height, parts[1], quality
 
-    # 定义你想要的输出格式
-    target_format = 'png'
 
-    batch_resize_images(input_directory, output_directory, target_max_width, target_max_height, target_format)
\ No newline at end of file
+def parse_arguments(argv=None):
+    """解析命令行参数，默认值即下面的使用示例
+    :param argv: 参数列表，默认使用 sys.argv[1:]
+    """
+    parser = argparse.ArgumentParser(description='批量等比缩放图片并转换格式')
+    parser.add_argument('input_folder', nargs='?', default='input_images', help='输入文件夹 (默认: input_images)')
+    parser.add_argument('output_folder', nargs='?', default='output_images_resized',
+                        help='输出文件夹 (默认: output_images_resized)')
+    parser.add_argument('--width', type=int, default=800, help='最大宽度 (默认: 800)')
+    parser.add_argument('--height', type=int, default=600, help='最大高度 (默认: 600)')
+    parser.add_argument('-f', '--format', default='png', help='输出格式 (默认: png)')
+    parser.add_argument('-p', '--preset', choices=list(PRESETS), default='balanced',
+                        help='速度/质量预设 (默认: balanced)')
+    parser.add_argument('-q', '--quality', type=int, default=None, help='JPEG/WebP 编码质量 1-95')
+    parser.add_argument('-r', '--rendition', type=parse_rendition, action='append', metavar='WxH:FMT[:Q]',
+                        help='多规格模式：可重复指定，每张原图只解码一次，输出到各自的子文件夹，'
+                             '例如 -r 320x240:webp:80 -r 1920x1080:png；指定后忽略 --width/--height/--format')
+    parser.add_argument('-R', '--recursive', action='store_true', help='递归处理子文件夹，输出保持相同的目录结构')
+    parser.add_argument('--include', action='append', metavar='GLOB', help='只处理匹配的图片，可重复指定，例如 --include "*.png"')
+    parser.add_argument('--exclude', action='append', metavar='GLOB', help='跳过匹配的图片或子文件夹，可重复指定')
+    parser.add_argument('--force', action='store_true', help='忽略处理清单，重新处理所有图片')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='并行处理的进程数 (默认: CPU 核心数)')
+    return parser.parse_args(argv)
+
+
+# --- 使用示例 ---
+if __name__ == "__main__":
+    """
+    提示：脚本会将图片等比例缩放，确保其宽度不超过 --width，高度不超过 --height。
+    直接运行时使用默认参数：input_images -> output_images_resized，800x600，png。
+    """
+    args = parse_arguments()
+    if args.rendition:
+        batch_render_images(args.input_folder, args.output_folder, args.rendition, workers=args.workers,
+                            preset=args.preset, incremental=not args.force, recursive=args.recursive,
+                            include=args.include, exclude=args.exclude)
+    else:
+        batch_resize_images(args.input_folder, args.output_folder, args.width, args.height, args.format,
+                            workers=args.workers, preset=args.preset, quality=args.quality,
+                            incremental=not args.force, recursive=args.recursive, include=args.include,
+                            exclude=args.exclude)
@@ -1,64 +1,442 @@
-# 需要安装moviepy库
+# 需要安装 ffmpeg（或 moviepy 库，它自带一个 ffmpeg）
 import os
-import glob
-from moviepy import VideoFileClip
+import re
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
+from file_scanner import VIDEO_EXTENSIONS, scan_files
 
-def batch_extract_audio(input_folder, output_folder, output_format="mp3"):
+# 输出格式 -> 可以直接复制（不重新编码）的音频编码
+COPY_COMPATIBLE = {
+    'm4a': {'aac', 'alac'},
+    'aac': {'aac'},
+    'mp3': {'mp3'},
+    'opus': {'opus'},
+    'ogg': {'vorbis', 'opus', 'flac'},
+    'webm': {'opus', 'vorbis'},
+    'flac': {'flac'},
+    'wav': {'pcm_s16le', 'pcm_s24le', 'pcm_f32le', 'pcm_u8'},
+    'mka': None,  # Matroska 音频可以容纳任意编码
+}
+
+# 需要转码时使用的编码器，未列出的格式由 ffmpeg 按扩展名选择默认编码器
+TRANSCODE_ENCODERS = {
+    'm4a': 'aac',
+    'aac': 'aac',
+    'mp3': 'libmp3lame',
+    'opus': 'libopus',
+    'ogg': 'libvorbis',
+    'webm': 'libopus',
+    'flac': 'flac',
+    'wav': 'pcm_s16le',
+}
+
+# ffmpeg -i 输出中的音频流，例如 "Stream #0:1[0x2](und): Audio: aac (LC) (mp4a / 0x6134706D), 44100 Hz"
+_AUDIO_STREAM_RE = re.compile(r'Stream #\d+:\d+\S*: Audio: (\w+)')
+_DURATION_RE = re.compile(r'Duration: (\d+):(\d+):(\d+(?:\.\d+)?)')
+_SILENCE_START_RE = re.compile(r'silence_start: (-?\d+(?:\.\d+)?)')
+_SILENCE_END_RE = re.compile(r'silence_end: (-?\d+(?:\.\d+)?)')
+
+# 按静音分段时的静音判定：低于该音量、且持续至少这么多秒
+SILENCE_NOISE = '-30dB'
+SILENCE_MIN_DURATION = 0.5
+
+
+def find_ffmpeg():
+    """
+    查找 ffmpeg 和 ffprobe 可执行文件
+    :return: (ffmpeg 路径或 None, ffprobe 路径或 None)
+    """
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        try:
+            # moviepy 依赖的 imageio-ffmpeg 自带一个 ffmpeg（但没有 ffprobe）
+            import imageio_ffmpeg
+            ffmpeg = imageio_ffmpeg.get_ffmpeg_exe()
+        except (ImportError, RuntimeError):
+            return None, None
+    return ffmpeg, shutil.which('ffprobe')
+
+
+def probe_media(video_path, ffmpeg, ffprobe=None, timeout=None):
+    """
+    读取视频中各音频流的编码名称和时长，只读取文件头，不解码
+    :param video_path: 视频文件路径
+    :param ffmpeg: ffmpeg 路径，没有 ffprobe 时解析 `ffmpeg -i` 的输出
+    :param ffprobe: ffprobe 路径，可为 None
+    :param timeout: 超时秒数
+    :return: (音频编码名称列表，例如 ['aac']，没有音轨时为空列表, 时长秒数，未知时为 0.0)
+    :raises ValueError: 文件无法识别为媒体文件
+    """
+    if ffprobe:
+        result = subprocess.run([ffprobe, '-v', 'error', '-select_streams', 'a', '-show_entries',
+                                 'stream=codec_name:format=duration', '-of', 'json', video_path],
+                                capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=timeout)
+        if result.returncode == 0:
+            info = json.loads(result.stdout)
+            codecs = [stream.get('codec_name', '') for stream in info.get('streams', [])]
+            try:
+                duration = float(info.get('format', {}).get('duration', 0.0))
+            except ValueError:
+                duration = 0.0
+            return codecs, duration
+    # 没有输出文件时 ffmpeg 会以错误码退出，但仍会打印输入文件的流信息
+    result = subprocess.run([ffmpeg, '-hide_banner', '-nostdin', '-i', video_path],
+                            capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=timeout)
+    if 'Stream #' not in result.stderr:
+        raise ValueError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else '无法读取文件')
+    m = _DURATION_RE.search(result.stderr)
+    duration = int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3)) if m else 0.0
+    return _AUDIO_STREAM_RE.findall(result.stderr), duration
+
+
+def detect_silences(video_path, ffmpeg, track=0, noise=SILENCE_NOISE, min_duration=SILENCE_MIN_DURATION,
+                    timeout=None):
+    """
+    用 ffmpeg 的 silencedetect 滤镜找出一条音轨中的静音区间（只解码音频，不解码视频）
+    :return: 静音区间列表 [(开始秒数, 结束秒数)]
+    """
+    command = [ffmpeg, '-hide_banner', '-nostdin', '-i', video_path, '-map', f'0:a:{track}', '-vn', '-sn', '-dn',
+               '-af', f'silencedetect=noise={noise}:d={min_duration}', '-f', 'null', '-']
+    result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', errors='replace',
+                            timeout=timeout)
+    if result.returncode != 0:
+        raise RuntimeError(f"静音检测失败: {result.stderr.strip()}")
+    starts = [float(v) for v in _SILENCE_START_RE.findall(result.stderr)]
+    ends = [float(v) for v in _SILENCE_END_RE.findall(result.stderr)]
+    return list(zip(starts, ends))
+
+
+def silence_cut_points(silences, duration, segment_time):
+    """
+    选择分段位置：每段不超过 segment_time 秒，尽量在静音的中点切开。
+    在 [上一刀 + segment_time / 2, 上一刀 + segment_time] 范围内找最靠后的静音，找不到时按固定长度切。
+    :return: 切分时间点列表（秒）
+    """
+    midpoints = [(start + end) / 2 for start, end in silences]
+    cuts = []
+    last = 0.0
+    while last + segment_time < duration:
+        window = [t for t in midpoints if last + segment_time / 2 <= t <= last + segment_time]
+        last = window[-1] if window else last + segment_time
+        cuts.append(last)
+    return cuts
+
+
+def temp_output_path(final_path, suffix='', folder=False):
+    """
+    在最终输出旁边创建一个唯一的临时文件（或文件夹），例如 'a.x8k2q1.part.mp3'。
+    a.mp4 和 a.mkv 这样主文件名相同的视频同时处理时，各自的临时文件不会互相覆盖。
+    :param suffix: 临时文件名末尾保留的扩展名，ffmpeg 需要它来判断输出格式
+    :param folder: 为 True 时创建临时文件夹（分段输出）
+    """
+    directory, name = os.path.split(final_path)
+    directory = directory or '.'
+    prefix = f"{os.path.splitext(name)[0] if suffix else name}."
+    if folder:
+        return tempfile.mkdtemp(prefix=prefix, suffix='.part', dir=directory)
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix=f'.part{suffix}', dir=directory)
+    os.close(fd)
+    return path
+
+
+def extract_audio_ffmpeg(video_path, output_path, output_format, ffmpeg, ffprobe=None, timeout=None, tracks=None,
+                         segment_time=None, split_on_silence=False):
+    """
+    用 ffmpeg 直接提取音轨：编码与输出格式兼容时无损复制，否则只解码音频进行转码，从不解码视频帧。
+    所有选中的音轨在同一条 ffmpeg 命令中输出，源文件只读取一次；分段时由 ffmpeg 边处理边写出每一段。
+    输出先写入临时文件（分段时为临时文件夹），全部成功后再改名，中途中断不会留下写了一半的文件。
+
+    :param output_path: 输出文件路径。指定 tracks 时每条音轨输出到 '名称.a音轨序号.扩展名'；
+                        分段时输出到同名文件夹（不带扩展名），其中为 000.扩展名、001.扩展名……
+    :param timeout: 超时秒数，超时后 ffmpeg 进程会被终止并抛出 subprocess.TimeoutExpired
+    :param tracks: None 只提取第一条音轨；'all' 提取全部音轨；或音轨序号列表（从 0 开始），例如 [0, 2]
+    :param segment_time: 每段的秒数，None 表示不分段
+    :param split_on_silence: 分段时尽量在静音处切开（需要先单独检测一遍静音，只解码音频）
+    :return: ([(输出路径, 'copy' 或 'transcode')], 时长秒数)；视频没有音轨时返回 ([], 时长秒数)
+    """
+    codecs, duration = probe_media(video_path, ffmpeg, ffprobe, timeout)
+    if not codecs:
+        return [], duration
+
+    if tracks is None:
+        selected = [0]
+    elif tracks == 'all':
+        selected = list(range(len(codecs)))
+    else:
+        missing = [i for i in tracks if not 0 <= i < len(codecs)]
+        if missing:
+            raise ValueError(f"音轨 {missing} 不存在，该视频只有 {len(codecs)} 条音轨")
+        selected = list(tracks)
+
+    segment_options = []
+    if segment_time:
+        segment_options = ['-f', 'segment', '-reset_timestamps', '1']
+        cuts = []
+        if split_on_silence:
+            # 切分点必须在写出之前确定，所以静音检测需要单独读一遍（只解码音频）
+            silences = detect_silences(video_path, ffmpeg, selected[0], timeout=timeout)
+            cuts = silence_cut_points(silences, duration, segment_time)
+        if cuts:
+            segment_options += ['-segment_times', ','.join(f"{t:.3f}" for t in cuts)]
+        else:
+            # 不足一段或时长未知时没有切分点，仍要给出段长，否则 segment 默认每 2 秒切一段
+            segment_options += ['-segment_time', str(segment_time)]
+
+    output_format = output_format.lower()
+    compatible = COPY_COMPATIBLE.get(output_format, set())
+    root, ext = os.path.splitext(output_path)
+    command = [ffmpeg, '-hide_banner', '-nostdin', '-loglevel', 'error', '-y', '-i', video_path]
+    outputs = []  # (最终路径, 临时路径, 提取方式)
+    for track in selected:
+        mode = 'copy' if compatible is None or codecs[track] in compatible else 'transcode'
+        final_path = output_path if tracks is None else f"{root}.a{track}{ext}"
+        command += ['-map', f'0:a:{track}', '-vn', '-sn', '-dn']
+        if mode == 'copy':
+            command += ['-c:a', 'copy']
+        elif output_format in TRANSCODE_ENCODERS:
+            command += ['-c:a', TRANSCODE_ENCODERS[output_format]]
+        if segment_time:
+            final_path = os.path.splitext(final_path)[0]
+            tmp_path = temp_output_path(final_path, folder=True)
+            command += segment_options + [os.path.join(tmp_path, f'%03d{ext}')]
+        else:
+            # 保留扩展名，ffmpeg 需要它来判断输出格式
+            tmp_path = temp_output_path(final_path, ext)
+            command.append(tmp_path)
+        outputs.append((final_path, tmp_path, mode))
+
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', errors='replace',
+                                timeout=timeout)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg 执行失败: {result.stderr.strip()}")
+        for final_path, tmp_path, _ in outputs:
+            if os.path.isdir(final_path):
+                shutil.rmtree(final_path)  # 上一次的分段结果
+            os.replace(tmp_path, final_path)
+    finally:
+        for _, tmp_path, _ in outputs:
+            if os.path.isdir(tmp_path):
+                shutil.rmtree(tmp_path)
+            elif os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return [(final_path, mode) for final_path, _, mode in outputs], duration
+
+
+def extract_audio_moviepy(video_path, output_path):
+    """
+    用 moviepy 提取音频（会解码并重新编码整条音轨，较慢），作为没有可用 ffmpeg 时的后备方案
+    :return: ('moviepy', 时长秒数)；视频没有音轨时返回 (None, 时长秒数)
+    """
+    from moviepy import VideoFileClip
+
+    with VideoFileClip(video_path) as video:
+        if video.audio is None:
+            return None, video.duration or 0.0
+        # 提取音频并写入文件
+        video.audio.write_audiofile(output_path, logger=None)
+        return 'moviepy', video.duration or 0.0
+
+
+def extract_one(video_path, output_path, output_format, backend, ffmpeg, ffprobe, timeout, tracks=None,
+                segment_time=None, split_on_silence=False):
+    """
+    提取一个视频的音频，参数见 extract_audio_ffmpeg()。moviepy 只作为提取第一条音轨、不分段时的后备方案；
+    和 ffmpeg 一样先写入临时文件，成功后再改名为最终文件名。
+
+    :return: ([(输出路径, 提取方式)]，没有音轨时为空列表, 时长秒数, 提示信息或 None)
+    """
+    simple = tracks is None and not segment_time
+    if ffmpeg is None and not simple:
+        raise RuntimeError("多音轨和分段输出需要 ffmpeg")
+
+    note = None
+    if ffmpeg is not None:
+        try:
+            outputs, duration = extract_audio_ffmpeg(video_path, output_path, output_format, ffmpeg, ffprobe,
+                                                     timeout, tracks, segment_time, split_on_silence)
+            return outputs, duration, note
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"超过 {timeout} 秒未完成，已终止")
+        except ValueError:
+            raise  # 文件本身无法识别或音轨不存在，换 moviepy 也没用
+        except Exception as e:
+            if backend == 'ffmpeg' or not simple:
+                raise
+            note = f"ffmpeg 处理失败，改用 moviepy: {e}"
+
+    tmp_path = temp_output_path(output_path, os.path.splitext(output_path)[1])
+    try:
+        mode, duration = extract_audio_moviepy(video_path, tmp_path)
+        if mode is None:
+            return [], duration, note
+        os.replace(tmp_path, output_path)
+        return [(output_path, mode)], duration, note
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def batch_extract_audio(input_folder, output_folder, output_format="mp3", recursive=False, include=None,
+                        exclude=None, backend="auto", workers=1, timeout=None, tracks=None, segment_time=None,
+                        split_on_silence=False):
     """
     批量从指定文件夹中的所有视频提取音频，并保存到输出文件夹。
 
     :param input_folder: 包含视频文件的输入文件夹路径。
     :param output_folder: 用于保存提取出的音频文件的输出文件夹路径。
     :param output_format: 输出音频的格式, 如 'mp3', 'wav', 'ogg'。
+    :param recursive: 是否递归处理子文件夹，输出文件夹中会还原相同的目录结构。
+    :param include: 可选的通配符列表，只处理匹配的视频（匹配相对路径或文件名），例如 ['*.mkv']。
+    :param exclude: 可选的通配符列表，跳过匹配的视频或子文件夹。
+    :param backend: 'ffmpeg'、'moviepy' 或 'auto'（默认：有 ffmpeg 时直接调用 ffmpeg，失败时退回 moviepy）。
+    :param workers: 同时运行的 ffmpeg 进程数上限，为 1 时逐个处理。
+    :param timeout: 每个视频的超时秒数（只对 ffmpeg 生效），None 表示不限制。
+    :param tracks: None 只提取第一条音轨；'all' 提取全部音轨；或音轨序号列表，例如 [0, 2]。
+                   指定时每条音轨输出为 '名称.a序号.格式'。
+    :param segment_time: 把音频切成每段不超过这么多秒，输出到与视频同名的文件夹中；None 表示不分段。
+    :param split_on_silence: 分段时尽量在静音处切开。
+    :return: 统计信息字典 {'processed': 成功数, 'skipped': 无音轨数, 'failed': [(文件, 错误信息)],
+             'media_seconds': 处理的媒体总时长, 'elapsed': 耗时秒数}
     """
+    ffmpeg, ffprobe = find_ffmpeg() if backend != 'moviepy' else (None, None)
+    if backend == 'ffmpeg' and ffmpeg is None:
+        raise RuntimeError("未找到 ffmpeg，请安装 ffmpeg 或使用 backend='moviepy'")
+
+    summary = {'processed': 0, 'skipped': 0, 'failed': [], 'media_seconds': 0.0, 'elapsed': 0.0}
+    if not os.path.isdir(input_folder):
+        # 在创建输出文件夹之前检查
+        print(f"在文件夹 '{input_folder}' 中未找到支持的视频文件。")
+        return summary
+
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
         print(f"已创建输出文件夹: {output_folder}")
 
-    supported_formats = ["*.mp4", "*.avi", "*.mov", "*.mkv", "*.webm"]
-    video_files = []
-    for fmt in supported_formats:
-        video_files.extend(glob.glob(os.path.join(input_folder, fmt)))
+    # 边扫描边处理，不必等整个文件夹扫描完
+    video_files = scan_files(input_folder, VIDEO_EXTENSIONS, recursive=recursive, include=include,
+                             exclude=exclude, skip_dirs=[output_folder])
 
-    if not video_files:
-        print(f"在文件夹 '{input_folder}' 中未找到支持的视频文件。")
-        return
+    print(f"正在扫描 '{input_folder}'{'（包括子文件夹）' if recursive else ''}，"
+          f"最多同时处理 {workers} 个视频...")
 
-    print(f"找到 {len(video_files)} 个视频文件，开始处理...")
+    start = time.perf_counter()
 
-    for index, video_path in enumerate(video_files):
-        base_name = os.path.basename(video_path)
-        file_name_without_ext = os.path.splitext(base_name)[0]
+    def report(rel_path, future):
+        """打印一个视频的处理结果并计入统计"""
+        done = summary['processed'] + summary['skipped'] + len(summary['failed']) + 1
+        try:
+            outputs, duration, note = future.result()
+        except Exception as e:
+            summary['failed'].append((rel_path, str(e)))
+            print(f"({done}) 处理视频 '{rel_path}' 时发生错误: {e}")
+            return
+        if note:
+            print(f"  (提示: {rel_path} {note})")
+        if not outputs:
+            summary['skipped'] += 1
+            print(f"({done}) 警告: 视频 '{rel_path}' 不包含音频轨道，已跳过。")
+            return
+        summary['processed'] += 1
+        summary['media_seconds'] += duration
+        for output_audio_path, mode in outputs:
+            mode_name = {'copy': '无损复制', 'transcode': '转码', 'moviepy': 'moviepy'}[mode]
+            print(f"({done}) 成功提取音频 ({mode_name}, {duration:.1f} 秒) -> {output_audio_path}")
 
-        # --- 核心改进：使用可配置的输出格式 ---
-        output_audio_path = os.path.join(output_folder, f"{file_name_without_ext}.{output_format}")
+    # ffmpeg 在子进程中运行，线程只负责等待，因此用线程池；同时提交的任务数有上限
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        running = {}  # future -> 相对路径
+        claimed = {}  # 输出路径 -> 相对路径，主文件名相同的视频（如 a.mp4 和 a.mkv）会得到相同的输出路径
+        for video_path, rel_path, _ in video_files:
+            file_name_without_ext = os.path.splitext(rel_path)[0]
 
-        print(f"--- ({index + 1}/{len(video_files)}) 正在处理: {base_name} ---")
+            # --- 核心改进：使用可配置的输出格式，并还原输入文件夹的目录结构 ---
+            output_audio_path = os.path.join(output_folder, f"{file_name_without_ext}.{output_format}")
+            key = os.path.normcase(os.path.abspath(output_audio_path))
+            if key in claimed:
+                error = f"输出文件与 '{claimed[key]}' 相同，已跳过"
+                summary['failed'].append((rel_path, error))
+                print(f"处理视频 '{rel_path}' 时发生错误: {error}")
+                continue
+            claimed[key] = rel_path
+            os.makedirs(os.path.dirname(output_audio_path), exist_ok=True)
 
-        try:
-            with VideoFileClip(video_path) as video:
-                if video.audio is None:
-                    print(f"警告: 视频 '{base_name}' 不包含音频轨道，已跳过。")
-                    continue
+            future = executor.submit(extract_one, video_path, output_audio_path, output_format, backend,
+                                     ffmpeg, ffprobe, timeout, tracks, segment_time, split_on_silence)
+            running[future] = rel_path
+            if len(running) >= max(1, workers) * 2:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report(running.pop(future), future)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                report(running.pop(future), future)
 
-                # 提取音频并写入文件
-                video.audio.write_audiofile(output_audio_path, logger=None)
-                print(f"成功提取音频 -> {output_audio_path}")
+    summary['elapsed'] = time.perf_counter() - start
+    total = summary['processed'] + summary['skipped'] + len(summary['failed'])
+    if total == 0:
+        print(f"在文件夹 '{input_folder}' 中未找到支持的视频文件。")
+        return summary
 
-        except Exception as e:
-            print(f"处理视频 '{base_name}' 时发生错误: {e}")
+    speed = summary['media_seconds'] / summary['elapsed'] if summary['elapsed'] else 0.0
+    print(f"\n所有视频处理完成！共 {total} 个视频，成功 {summary['processed']} 个，"
+          f"无音轨 {summary['skipped']} 个，失败 {len(summary['failed'])} 个。")
+    print(f"处理了 {summary['media_seconds']:.1f} 秒的媒体，用时 {summary['elapsed']:.2f} 秒 "
+          f"({speed:.1f} 倍速)")
+    for rel_path, error in summary['failed']:
+        print(f"  失败: {rel_path} - {error}")
+    return summary
 
-    print("\n所有视频处理完成！")
 
+def parse_tracks(text):
+    """解析 --tracks 参数：'all' 或逗号分隔的音轨序号"""
+    if text == 'all':
+        return 'all'
+    try:
+        return [int(v) for v in text.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"音轨应为 all 或逗号分隔的序号，例如 0,2，而不是 {text}")
 
-# --- 使用示例 ---
-if __name__ == "__main__":
-    input_directory = "input_videos"
-    output_directory = "output_audio"
 
-    # --- 新增：在这里定义你想要的输出音频格式 ---
-    target_audio_format = "mp3"  # 或者 "wav", "ogg"
+def parse_arguments(argv=None):
+    """解析命令行参数，默认值即下面的使用示例
+    :param argv: 参数列表，默认使用 sys.argv[1:]
+    """
+    parser = argparse.ArgumentParser(description='批量从视频中提取音频')
+    parser.add_argument('input_folder', nargs='?', default='input_videos', help='输入文件夹 (默认: input_videos)')
+    parser.add_argument('output_folder', nargs='?', default='output_audio', help='输出文件夹 (默认: output_audio)')
+    parser.add_argument('-f', '--format', default='mp3', help='输出音频格式，例如 mp3、m4a、ogg、wav (默认: mp3)')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='同时运行的 ffmpeg 进程数 (默认: CPU 核心数)')
+    parser.add_argument('--timeout', type=float, default=None, help='每个视频的超时秒数 (默认: 不限制)')
+    parser.add_argument('--backend', choices=['auto', 'ffmpeg', 'moviepy'], default='auto',
+                        help='提取方式 (默认: auto，优先直接调用 ffmpeg)')
+    parser.add_argument('-t', '--tracks', type=parse_tracks, default=None, metavar='all|0,2',
+                        help='提取哪些音轨：all 或逗号分隔的序号 (默认: 只提取第一条音轨)')
+    parser.add_argument('-s', '--segment', type=float, default=None, metavar='SECONDS',
+                        help='把音频切成每段不超过 SECONDS 秒，保存到与视频同名的文件夹中')
+    parser.add_argument('--split-on-silence', action='store_true', help='分段时尽量在静音处切开')
+    parser.add_argument('-R', '--recursive', action='store_true', help='递归处理子文件夹，输出保持相同的目录结构')
+    parser.add_argument('--include', action='append', metavar='GLOB', help='只处理匹配的视频，可重复指定')
+    parser.add_argument('--exclude', action='append', metavar='GLOB', help='跳过匹配的视频或子文件夹，可重复指定')
+    return parser.parse_args(argv)
+
 
-    # 调用批量处理函数
-    batch_extract_audio(input_directory, output_directory, target_audio_format)
\ No newline at end of file
+# --- 使用示例 ---
+if __name__ == "__main__":
+    """
+    直接运行时使用默认参数：input_videos -> output_audio，mp3。
+    例如：python 视频声音分离.py input_videos output_audio -f m4a -j 8 --timeout 600
+    """
+    args = parse_arguments()
+    batch_extract_audio(args.input_folder, args.output_folder, args.format, recursive=args.recursive,
+                        include=args.include, exclude=args.exclude, backend=args.backend, workers=args.workers,
+                        timeout=args.timeout, tracks=args.tracks, segment_time=args.segment,
+                        split_on_silence=args.split_on_silence)